@@ -4,7 +4,84 @@ Pakub funktsionaalsust mängude salvestamiseks, mängijate soorituse jälgimisek
 ja erinevate statistikate pärimiseks mängude ja mängijate kohta.
 """
 
+import array
+import bisect
 import collections
+import collections.abc
+import csv
+import heapq
+import io
+import itertools
+import mmap
+import os
+import pickle
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_BLOCK_SIZE = 1 << 20
+
+PLAYER_COLUMNS = ("name", "plays", "wins", "losses", "win_rate", "favourite_game", "record_score")
+GAME_COLUMNS = ("name", "plays", "player_amount", "most_wins", "most_frequent_winner", "most_losses",
+                "most_frequent_loser", "record_holder", "record_score")
+
+SNAPSHOT_MAGIC = b"BGSTATS\0"
+# Suurendada iga kord, kui hetkepildi sisu muutub; vanemaid hetkepilte ei loeta
+SNAPSHOT_VERSION = 5
+_SNAPSHOT_HEADER = struct.Struct("<8sH")
+
+Play = collections.namedtuple("Play", ["game_name", "players", "result_type", "results", "scores", "winners", "losers"])
+
+
+def parse_play(line):
+    """
+    Parsi üks logirida mängukorraks.
+    
+    Võitjad ja kaotajad arvutatakse siin üks kord ning sama tulemust
+    kasutavad nii Game kui ka Player.
+    
+    Args:
+        line (str): Rida kujul "mäng;mängija1,mängija2;tulemuse tüüp;tulemused"
+        
+    Returns:
+        Play: Parsitud mängukord
+    """
+    game_name, players_str, result_type, results_str = line.strip().split(";")
+    players = players_str.split(",")
+    results = results_str.split(",")
+    return Play(game_name, players, result_type, results, *_winners_and_losers(players, result_type, results))
+
+
+def _winners_and_losers(players, result_type, results):
+    """
+    Arvuta mängukorra punktid, võitjad ja kaotajad.
+    
+    Args:
+        players (list): Osalenud mängijate nimede loend
+        result_type (str): Tulemuse tüüp ("points", "places" või "winner")
+        results (list): Mängu tulemused, formaat sõltub result_type'st
+        
+    Returns:
+        tuple: Punktide loend (või None), võitjate loend ja kaotajate loend
+    """
+    if result_type == "points":
+        scores = list(map(int, results))
+        max_score = max(scores)
+        min_score = min(scores)
+        winners = [players[i] for i, score in enumerate(scores) if score == max_score]
+        losers = [players[i] for i, score in enumerate(scores) if score == min_score]
+        return scores, winners, losers
+    if result_type == "places":
+        return None, [results[0]], [results[-1]]
+    if result_type == "winner":
+        return None, [results[0]], []
+    return None, [], []
 
 
 class Player:
@@ -40,6 +117,20 @@ class Player:
         if lost:
             self.losses += 1
     
+    def merge(self, other):
+        """
+        Lisa teise sama mängija objekti statistika selle mängija omale.
+        
+        Uued mängud lisatakse selles järjekorras, milles need teises objektis esimest korda ilmusid.
+        
+        Args:
+            other (Player): Sama mängija osaline statistika
+        """
+        for game_name, count in other.games_played.items():
+            self.games_played[game_name] += count
+        self.wins += other.wins
+        self.losses += other.losses
+    
     def favourite_game(self):
         """
         Määra mängija kõige sagedamini mängitud mäng.
@@ -50,6 +141,78 @@ class Player:
         return max(self.games_played, key=self.games_played.get, default=None)
 
 
+class Leaderboard:
+    """
+    Mängijate edetabel, mida uuendatakse iga väärtuse muutumisel.
+    
+    Kirjed (-väärtus, järjekord, versioon, nimi) on kuhjas, kus vananenud versioonid
+    jäetakse päringul vahele. Võrdsete väärtuste korral on eespool mängija, kes
+    lisati edetabelisse varem, nagu max() sõnastiku lisamisjärjekorras.
+    """
+    
+    def __init__(self):
+        """Lähtesta tühi edetabel."""
+        self.values = {}
+        self._ranks = {}
+        self._versions = {}
+        self._heap = []
+    
+    def rank(self, name):
+        """
+        Leia mängija järjekorranumber võrdsete väärtuste eristamiseks, vajadusel lisades selle.
+        
+        Args:
+            name (str): Mängija nimi
+            
+        Returns:
+            int: Mitmendana mängija edetabelisse lisati
+        """
+        if name not in self._ranks:
+            self._ranks[name] = len(self._ranks)
+        return self._ranks[name]
+    
+    def update(self, name, value, rank=None):
+        """
+        Määra mängija uus väärtus ajaga O(log n).
+        
+        Args:
+            name (str): Mängija nimi
+            value: Uus väärtus
+            rank (int): Järjekorranumber võrdsete väärtuste eristamiseks (vaikimisi selle edetabeli oma)
+        """
+        if rank is None:
+            rank = self.rank(name)
+        version = self._versions.get(name, 0) + 1
+        self._versions[name] = version
+        self.values[name] = value
+        heapq.heappush(self._heap, (-value, rank, version, name))
+        if len(self._heap) > 2 * len(self.values) + 16:
+            self._heap = [entry for entry in self._heap if self._versions[entry[3]] == entry[2]]
+            heapq.heapify(self._heap)
+    
+    def top(self, k):
+        """
+        Leia k suurima väärtusega mängijat ajaga O(k log k), kuhja lugemata.
+        
+        Args:
+            k (int): Soovitud mängijate arv
+            
+        Returns:
+            list: Mängijate nimed väärtuse kahanemise järjekorras
+        """
+        heap = self._heap
+        result = []
+        candidates = [(heap[0], 0)] if heap else []
+        while candidates and len(result) < k:
+            entry, index = heapq.heappop(candidates)
+            if self._versions[entry[3]] == entry[2]:
+                result.append(entry[3])
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child], child))
+        return result
+
+
 class Game:
     """
     Esindab konkreetset mängu koos selle statistikaga.
@@ -71,6 +234,16 @@ class Game:
         self.high_scores = {}
         # Jälgi mängijate osalemiste arvu
         self.player_plays = collections.defaultdict(int)
+        self._win_leaderboard = Leaderboard()
+        self._loss_leaderboard = Leaderboard()
+        self._win_rate_leaderboard = Leaderboard()
+        self._loss_rate_leaderboard = Leaderboard()
+        self._score_leaderboard = Leaderboard()
+        # Mängijad, kelle edetabelikohad tuleb enne järgmist päringut uuendada
+        self._changed_wins = {}
+        self._changed_losses = {}
+        self._changed_scores = {}
+        self._changed_rates = {}
     
     def add_play(self, players, result_type, results):
         """
@@ -81,39 +254,99 @@ class Game:
             result_type (str): Tulemuse tüüp ("points", "places" või "winner")
             results (list): Mängu tulemused, formaat sõltub result_type'st
         """
+        scores, winners, losers = _winners_and_losers(players, result_type, results)
+        self.add_parsed_play(Play(self.name, players, result_type, results, scores, winners, losers))
+    
+    def add_parsed_play(self, play):
+        """
+        Salvesta üks juba parsitud mängukord.
+        
+        Args:
+            play (Play): Mängukord koos arvutatud võitjate ja kaotajatega
+        """
         self.play_count += 1
-        self.player_counts[len(players)] += 1
+        self.player_counts[len(play.players)] += 1
         
         # Jälgi iga mängija osalemist
-        for player in players:
+        for player in play.players:
             self.player_plays[player] += 1
         
-        if result_type == "points":
-            scores = list(map(int, results))
-            max_score = max(scores)
-            min_score = min(scores)
-            
-            winners = [players[i] for i, score in enumerate(scores) if score == max_score]
-            losers = [players[i] for i, score in enumerate(scores) if score == min_score]
-            
-            for winner in winners:
-                self.wins[winner] += 1
-            for loser in losers:
-                self.losses[loser] += 1
-            
-            for player, score in zip(players, scores):
+        for winner in play.winners:
+            self.wins[winner] += 1
+            self._changed_wins[winner] = None
+        for loser in play.losers:
+            self.losses[loser] += 1
+            self._changed_losses[loser] = None
+        
+        if play.scores is not None:
+            for player, score in zip(play.players, play.scores):
                 if player not in self.high_scores or self.high_scores[player] < score:
                     self.high_scores[player] = score
+                    self._changed_scores[player] = None
         
-        elif result_type == "places":
-            winner = results[0]
-            loser = results[-1]
-            self.wins[winner] += 1
-            self.losses[loser] += 1
+        self._changed_rates.update(dict.fromkeys(play.players))
+        self._changed_rates.update(dict.fromkeys(play.winners))
+        self._changed_rates.update(dict.fromkeys(play.losers))
+    
+    def _update_leaderboards(self):
+        """
+        Vii edetabelid kooskõlla pärast viimast päringut muutunud mängijatega.
         
-        elif result_type == "winner":
-            winner = results[0]
-            self.wins[winner] += 1
+        Iga muutunud mängija uuendatakse ühe korra ajaga O(log n), ükskõik mitu
+        mängukorda teda vahepeal puudutas. Uued mängijad lisatakse edetabelisse
+        samas järjekorras, milles nad võitude, kaotuste või rekordite sõnastikku
+        jõudsid, nii et võrdsete väärtuste korral tulemus ei muutu. Võidu- ja
+        kaotusmäära edetabelid kasutavad võitude ja kaotuste edetabeli järjekorda,
+        nagu most_frequent_winner ja most_frequent_loser seda varem arvutasid.
+        """
+        for player in self._changed_wins:
+            self._win_leaderboard.update(player, self.wins[player])
+        for player in self._changed_losses:
+            self._loss_leaderboard.update(player, self.losses[player])
+        for player in self._changed_scores:
+            self._score_leaderboard.update(player, self.high_scores[player])
+        
+        for player in self._changed_rates:
+            plays = self.player_plays.get(player)
+            if not plays:
+                continue
+            if player in self.wins:
+                self._win_rate_leaderboard.update(player, self.wins[player] / plays,
+                                                  self._win_leaderboard.rank(player))
+            if player in self.losses:
+                self._loss_rate_leaderboard.update(player, self.losses[player] / plays,
+                                                   self._loss_leaderboard.rank(player))
+        
+        self._changed_wins.clear()
+        self._changed_losses.clear()
+        self._changed_scores.clear()
+        self._changed_rates.clear()
+    
+    def merge(self, other):
+        """
+        Lisa teise sama mängu objekti statistika selle mängu omale.
+        
+        Uued mängijad lisatakse selles järjekorras, milles need teises objektis esimest korda ilmusid,
+        seega hilisemate osade järjestikune liitmine säilitab võrdsete tulemuste järjekorra.
+        
+        Args:
+            other (Game): Sama mängu osaline statistika
+        """
+        self.play_count += other.play_count
+        for counts, other_counts in ((self.player_counts, other.player_counts), (self.wins, other.wins),
+                                     (self.losses, other.losses), (self.player_plays, other.player_plays)):
+            for key, count in other_counts.items():
+                counts[key] += count
+        for player, score in other.high_scores.items():
+            if player not in self.high_scores or self.high_scores[player] < score:
+                self.high_scores[player] = score
+                self._changed_scores[player] = None
+        
+        self._changed_wins.update(dict.fromkeys(other.wins))
+        self._changed_losses.update(dict.fromkeys(other.losses))
+        self._changed_rates.update(dict.fromkeys(other.player_plays))
+        self._changed_rates.update(dict.fromkeys(other.wins))
+        self._changed_rates.update(dict.fromkeys(other.losses))
     
     def most_wins(self):
         """
@@ -122,7 +355,7 @@ class Game:
         Returns:
             str või None: Kõige rohkem võitnud mängija nimi või None kui võite pole registreeritud
         """
-        return max(self.wins, key=self.wins.get, default=None)
+        return next(iter(self.top_winners(1)), None)
     
     def most_frequent_winner(self):
         """
@@ -132,19 +365,7 @@ class Game:
         Returns:
             str või None: Kõrgeima võidumääraga mängija nimi või None kui võite pole registreeritud
         """
-        if not self.wins:
-            return None
-        
-        # Arvuta võidusagedus kui võidud jagatud mängija mängitud mängudega
-        win_frequency = {}
-        for player, wins in self.wins.items():
-            if player in self.player_plays and self.player_plays[player] > 0:
-                win_frequency[player] = wins / self.player_plays[player]
-        
-        if not win_frequency:
-            return None
-        
-        return max(win_frequency, key=win_frequency.get)
+        return next(iter(self.top_frequent_winners(1)), None)
     
     def most_losses(self):
         """
@@ -153,7 +374,7 @@ class Game:
         Returns:
             str või None: Kõige rohkem kaotanud mängija nimi või None kui kaotusi pole registreeritud
         """
-        return max(self.losses, key=self.losses.get, default=None)
+        return next(iter(self.top_losers(1)), None)
     
     def most_frequent_loser(self):
         """
@@ -163,19 +384,7 @@ class Game:
         Returns:
             str või None: Kõrgeima kaotuse määraga mängija nimi või None kui kaotusi pole registreeritud
         """
-        if not self.losses:
-            return None
-        
-        # Arvuta kaotussagedus kui kaotused jagatud mängija mängitud mängudega
-        loss_frequency = {}
-        for player, losses in self.losses.items():
-            if player in self.player_plays and self.player_plays[player] > 0:
-                loss_frequency[player] = losses / self.player_plays[player]
-        
-        if not loss_frequency:
-            return None
-        
-        return max(loss_frequency, key=loss_frequency.get)
+        return next(iter(self.top_frequent_losers(1)), None)
     
     def record_holder(self):
         """
@@ -184,142 +393,2167 @@ class Game:
         Returns:
             str või None: Kõrgeima punktisummaga mängija nimi või None kui punkte pole registreeritud
         """
-        return max(self.high_scores, key=self.high_scores.get, default=None)
+        return next(iter(self.top_scores(1)), None)
+    
+    def top_winners(self, k):
+        """
+        Leia k kõige rohkem võitnud mängijat.
+        
+        Args:
+            k (int): Soovitud mängijate arv
+            
+        Returns:
+            list: Mängijate nimed võitude kahanemise järjekorras
+        """
+        self._update_leaderboards()
+        return self._win_leaderboard.top(k)
+    
+    def top_frequent_winners(self, k):
+        """
+        Leia k kõrgeima võidumääraga mängijat.
+        
+        Args:
+            k (int): Soovitud mängijate arv
+            
+        Returns:
+            list: Mängijate nimed võidumäära kahanemise järjekorras
+        """
+        self._update_leaderboards()
+        return self._win_rate_leaderboard.top(k)
+    
+    def top_losers(self, k):
+        """
+        Leia k kõige rohkem kaotanud mängijat.
+        
+        Args:
+            k (int): Soovitud mängijate arv
+            
+        Returns:
+            list: Mängijate nimed kaotuste kahanemise järjekorras
+        """
+        self._update_leaderboards()
+        return self._loss_leaderboard.top(k)
+    
+    def top_frequent_losers(self, k):
+        """
+        Leia k kõrgeima kaotuse määraga mängijat.
+        
+        Args:
+            k (int): Soovitud mängijate arv
+            
+        Returns:
+            list: Mängijate nimed kaotuse määra kahanemise järjekorras
+        """
+        self._update_leaderboards()
+        return self._loss_rate_leaderboard.top(k)
+    
+    def top_scores(self, k):
+        """
+        Leia k kõrgeima punktisummaga mängijat.
+        
+        Args:
+            k (int): Soovitud mängijate arv
+            
+        Returns:
+            list: Mängijate nimed parima punktisumma kahanemise järjekorras
+        """
+        self._update_leaderboards()
+        return self._score_leaderboard.top(k)
 
 
-class Statistics:
+class _NameTable:
     """
-    Keskne klass mängustatistika haldamiseks andmefailist.
-    Pakub meetodeid mitmesuguste statistikate pärimiseks mängude ja mängijate kohta.
+    Nimede ja täisarvuliste id-de vastavus ilma nime kohta Pythoni objekti hoidmata.
+    
+    Nimed on UTF-8 baitidena ühes bytearray's ja nende lõpunihked massiivis. id leitakse
+    avatud adresseerimisega paisktabelist, mille võti on nime CRC-32, nii et tabel ei
+    sõltu protsessi räsiseemnest ja selle saab hetkepildist otse kasutusele võtta.
     """
     
-    def __init__(self, filename):
+    def __init__(self):
+        """Lähtesta tühi tabel."""
+        self._data = bytearray()
+        self._ends = array.array("I")
+        self._table = array.array("i", [-1]) * 8
+    
+    def find(self, name):
         """
-        Lähtesta statistika, lugedes andmeid failist.
+        Leia nime id.
         
         Args:
-            filename (str): Mänguandmeid sisaldava faili asukoht
+            name (str): Nimi
+            
+        Returns:
+            int: Nime id või -1, kui nime pole
         """
-        self.players = {}
-        self.games = {}
-        self.total_games = 0
-        self.result_type_counts = collections.defaultdict(int)
+        return self._find(name.encode("utf-8"))[0]
+    
+    def add(self, name):
+        """
+        Leia nime id, vajadusel lisades nime.
         
-        with open(filename, "r", encoding="utf-8") as file:
-            for line in file:
-                self.total_games += 1
-                game_name, players_str, result_type, results_str = line.strip().split(";")
-                players = players_str.split(",")
-                results = results_str.split(",")
-                self.result_type_counts[result_type] += 1
-                
-                if game_name not in self.games:
-                    self.games[game_name] = Game(game_name)
-                self.games[game_name].add_play(players, result_type, results)
-                
-                for player in players:
-                    if player not in self.players:
-                        self.players[player] = Player(player)
-                    won = (result_type == "points" and player in [players[i] for i, score in enumerate(map(int, results)) if score == max(map(int, results))]) or \
-                          (result_type == "places" and player == results[0]) or \
-                          (result_type == "winner" and player == results[0])
-                    lost = (result_type in {"points", "places"} and player == results[-1])
-                    self.players[player].add_game(game_name, won, lost)
+        Args:
+            name (str): Nimi
+            
+        Returns:
+            int: Nime id, uutel nimedel lisamise järjekorras
+        """
+        data = name.encode("utf-8")
+        name_id, index = self._find(data)
+        if name_id >= 0:
+            return name_id
+        name_id = len(self._ends)
+        self._data += data
+        self._ends.append(len(self._data))
+        self._table[index] = name_id
+        if 2 * len(self._ends) > len(self._table):
+            self._rebuild(2 * len(self._table))
+        return name_id
     
-    def _get_player_info(self, player_name, info_type):
+    def __getitem__(self, name_id):
+        """Anna id-le vastav nimi."""
+        return self._encoded(name_id).decode("utf-8")
+    
+    def __iter__(self):
+        """Käi nimed läbi id-de järjekorras."""
+        return (self[name_id] for name_id in range(len(self._ends)))
+    
+    def __len__(self):
+        """Anna nimede arv."""
+        return len(self._ends)
+    
+    def to_state(self):
         """
-        Abimeetod mängijapõhise teabe saamiseks.
+        Anna tabel hetkepildi jaoks.
+        
+        Returns:
+            tuple: Nimede baidid, lõpunihete baidid ja paisktabeli baidid
+        """
+        return bytes(self._data), self._ends.tobytes(), self._table.tobytes()
+    
+    @classmethod
+    def from_state(cls, state):
+        """
+        Loo tabel to_state() antud baitidest ilma nimesid räsimata.
         
         Args:
-            player_name (str): Mängija nimi
-            info_type (str): Soovitud teabe tüüp
+            state (tuple): to_state() tulemus
             
         Returns:
-            Mitmesugused: Soovitud mängija teave või None, kui ei leitud
+            _NameTable: Taastatud tabel
         """
-        player = self.players.get(player_name)
-        if not player:
-            return None
+        table = cls()
+        data, ends, slots = state
+        table._data = bytearray(data)
+        table._ends = array.array("I")
+        table._ends.frombytes(ends)
+        table._table = array.array("i")
+        table._table.frombytes(slots)
+        return table
+    
+    def _encoded(self, name_id):
+        """Anna id-le vastava nime baidid."""
+        return self._data[self._ends[name_id - 1] if name_id else 0:self._ends[name_id]]
+    
+    def _find(self, data):
+        """Leia nime id ja paisktabeli koht, kus see on või kuhu see tuleks lisada."""
+        table = self._table
+        mask = len(table) - 1
+        index = zlib.crc32(data) & mask
+        while True:
+            name_id = table[index]
+            if name_id < 0 or self._encoded(name_id) == data:
+                return name_id, index
+            index = (index + 1) & mask
+    
+    def _rebuild(self, size):
+        """Koosta antud suurusega paisktabel ja paiguta nimed sinna."""
+        mask = size - 1
+        table = array.array("i", [-1]) * size
+        for name_id in range(len(self._ends)):
+            index = zlib.crc32(self._encoded(name_id)) & mask
+            while table[index] >= 0:
+                index = (index + 1) & mask
+            table[index] = name_id
+        self._table = table
+
+
+class _NarrowInts:
+    """
+    Täisarvude massiiv kitsa tüübiga, mille piiridesse mittemahtuvad väärtused on sõnastikus.
+    
+    Loendurid ja punktisummad on peaaegu alati väikesed, seega võtab väärtus tavaliselt ühe või kaks baiti.
+    Tüübi suurim väärtus massiivis tähendab, et tegelik väärtus on sõnastikus.
+    """
+    
+    _BOUNDS = {"B": (0, 0xFF), "h": (-(1 << 15), (1 << 15) - 1)}
+    
+    def __init__(self, typecode):
+        """
+        Lähtesta tühi massiiv.
+        
+        Args:
+            typecode (str): "B" mittenegatiivsete loendurite või "h" suvaliste täisarvude jaoks
+        """
+        self.values = array.array(typecode)
+        self.wide = {}
+        self._low, self._high = self._BOUNDS[typecode]
+    
+    def append(self, value):
+        """
+        Lisa väärtus massiivi lõppu.
+        
+        Args:
+            value (int): Lisatav väärtus
+        """
+        if self._low <= value < self._high:
+            self.values.append(value)
+        else:
+            self.values.append(self._high)
+            self.wide[len(self.values) - 1] = value
+    
+    def increment(self, index):
+        """
+        Suurenda indeksil olevat väärtust ühe võrra.
+        
+        Args:
+            index (int): Väärtuse indeks
+        """
+        value = self.values[index] + 1
+        if value < self._high:
+            self.values[index] = value
+        else:
+            self[index] = self[index] + 1
+    
+    def __getitem__(self, index):
+        """Anna indeksil olev väärtus."""
+        value = self.values[index]
+        return self.wide[index] if value == self._high else value
+    
+    def __setitem__(self, index, value):
+        """Määra indeksil olev väärtus."""
+        if self._low <= value < self._high:
+            self.values[index] = value
+            if self.wide:
+                self.wide.pop(index, None)
+        else:
+            self.values[index] = self._high
+            self.wide[index] = value
+    
+    def __len__(self):
+        """Anna väärtuste arv."""
+        return len(self.values)
+    
+    def to_state(self):
+        """
+        Anna massiiv hetkepildi jaoks.
+        
+        Returns:
+            tuple: Tüübikood, massiivi baidid ja suurte väärtuste sõnastik
+        """
+        return self.values.typecode, self.values.tobytes(), self.wide
+    
+    @classmethod
+    def from_state(cls, state):
+        """
+        Loo massiiv to_state() antud andmetest.
+        
+        Args:
+            state (tuple): to_state() tulemus
             
-        if info_type == "amount":
-            return sum(player.games_played.values())
-        if info_type == "favourite":
-            return player.favourite_game()
-        if info_type == "won":
-            return player.wins
-        return player
+        Returns:
+            _NarrowInts: Taastatud massiiv
+        """
+        typecode, data, wide = state
+        ints = cls(typecode)
+        ints.values.frombytes(data)
+        ints.wide = wide
+        return ints
+
+
+class _PlayerSlots:
+    """
+    Ühe mängu mängija -> pesa vastavus sorteeritud plokkidena, ilma paisktabelita.
     
-    def _get_game_info(self, game_name, info_type):
+    Võtmed kujul mängija << 32 | pesa on kasvavas järjekorras mitmes massiivis, millest
+    igaühes on kuni 2 * _BLOCK_KEYS võtit. Otsing on kaks kahendotsingut ja lisamine
+    nihutab ainult ühe ploki sisu. Pesa on massiivi indeks, kus mängija väärtus on.
+    """
+    
+    _BLOCK_KEYS = 512
+    _SLOT_MASK = (1 << 32) - 1
+    
+    def __init__(self):
+        """Lähtesta tühi vastavus."""
+        self._blocks = []
+        self._maxes = []
+        self._size = 0
+    
+    def get(self, player):
         """
-        Abimeetod mängupõhise teabe saamiseks.
+        Leia mängija pesa ajaga O(log n).
         
         Args:
-            game_name (str): Mängu nimi
-            info_type (str): Soovitud teabe tüüp
+            player (int): Mängija id
             
         Returns:
-            Mitmesugused: Soovitud mängu teave või None, kui ei leitud
+            int: Pesa või -1, kui mängijat pole
         """
-        game = self.games.get(game_name)
-        if not game:
-            return None
+        low = player << 32
+        index = bisect.bisect_left(self._maxes, low)
+        if index == len(self._maxes):
+            return -1
+        block = self._blocks[index]
+        key = block[bisect.bisect_left(block, low)]
+        return key & self._SLOT_MASK if key >> 32 == player else -1
+    
+    def setdefault(self, player, slot):
+        """
+        Leia mängija pesa, lisades mängija antud pessa, kui teda veel pole.
+        
+        Args:
+            player (int): Mängija id
+            slot (int): Uue mängija pesa
             
-        if info_type == "amount":
-            return game.play_count
-        if info_type == "player-amount":
-            return max(game.player_counts, key=game.player_counts.get, default=0)
-        if info_type == "most-wins":
-            return game.most_wins()
-        if info_type == "most-frequent-winner":
-            return game.most_frequent_winner()
-        if info_type == "most-losses":
-            return game.most_losses()
-        if info_type == "most-frequent-loser":
-            return game.most_frequent_loser()
-        if info_type == "record-holder":
-            return game.record_holder()
-        return game
+        Returns:
+            int: Mängija pesa
+        """
+        low = player << 32
+        maxes = self._maxes
+        index = bisect.bisect_left(maxes, low)
+        if index < len(maxes):
+            block = self._blocks[index]
+            position = bisect.bisect_left(block, low)
+            if block[position] >> 32 == player:
+                return block[position] & self._SLOT_MASK
+            block.insert(position, low | slot)
+        elif maxes:
+            index -= 1
+            block = self._blocks[index]
+            block.append(low | slot)
+            maxes[index] = low | slot
+        else:
+            block = array.array("q", [low | slot])
+            self._blocks.append(block)
+            maxes.append(low | slot)
+        self._size += 1
+        
+        if len(block) > 2 * self._BLOCK_KEYS:
+            half = self._BLOCK_KEYS
+            self._blocks[index:index + 1] = [block[:half], block[half:]]
+            maxes[index:index + 1] = [block[half - 1], maxes[index]]
+        return slot
     
-    def get(self, path):
+    def __iter__(self):
+        """Käi võtmed läbi mängija id järgi kasvavas järjekorras."""
+        return itertools.chain.from_iterable(self._blocks)
+    
+    def __len__(self):
+        """Anna mängijate arv."""
+        return self._size
+    
+    def players(self):
         """
-        Hangi statistika vastavalt määratud teele.
+        Anna mängijad pesade järjekorras, mis on nende lisamise järjekord.
+        
+        Returns:
+            list: Mängijate id-d
+        """
+        return [key >> 32 for key in sorted(self, key=lambda key: key & self._SLOT_MASK)]
+    
+    def to_state(self):
+        """
+        Anna võtmed hetkepildi jaoks.
+        
+        Returns:
+            bytes: Kõik võtmed kasvavas järjekorras
+        """
+        return b"".join(block.tobytes() for block in self._blocks)
+    
+    @classmethod
+    def from_state(cls, state):
+        """
+        Loo vastavus to_state() antud baitidest.
         
         Args:
-            path (str): Tee, mis määrab hangitava statistika
+            state (bytes): to_state() tulemus
             
         Returns:
-            Mitmesugused: Soovitud statistika või None, kui ei leitud
+            _PlayerSlots: Taastatud vastavus
+        """
+        keys = array.array("q")
+        keys.frombytes(state)
+        return cls.from_keys(keys)
+    
+    @classmethod
+    def from_keys(cls, keys):
         """
-        parts = path.strip("/").split("/")
+        Loo vastavus võtmete massiivist.
         
-        # Käsitle põhijuhtumeid
-        if not parts or not parts[0]:
-            return None
+        Args:
+            keys (array.array): Võtmed kujul mängija << 32 | pesa kasvavas järjekorras
             
-        # Hangi mängijate nimekiri
-        if parts[0] == "players":
-            return list(self.players.keys())
-            
-        # Hangi mängude nimekiri
-        if parts[0] == "games":
-            return list(self.games.keys())
-            
-        # Hangi mängude koguarv või tulemustüüpide loendus
-        if parts[0] == "total":
-            if len(parts) == 1:
-                return self.total_games
-            return self.result_type_counts.get(parts[1], 0)
-            
-        # Hangi mängija teave
-        if parts[0] == "player" and len(parts) > 1:
-            if len(parts) <= 2:
-                return self.players.get(parts[1])
-            return self._get_player_info(parts[1], parts[2])
-            
-        # Hangi mängu teave
-        if parts[0] == "game" and len(parts) > 1:
-            if len(parts) <= 2:
-                return self.games.get(parts[1])
-            return self._get_game_info(parts[1], parts[2])
-            
-        return None
+        Returns:
+            _PlayerSlots: Uus vastavus
+        """
+        slots = cls()
+        slots._blocks = [keys[start:start + cls._BLOCK_KEYS] for start in range(0, len(keys), cls._BLOCK_KEYS)]
+        slots._maxes = [block[-1] for block in slots._blocks]
+        slots._size = len(keys)
+        return slots
+
+
+class _CompactLeaderboard:
+    """
+    Ühe mängu ühe edetabeli esimesed kohad ja pärast nende arvutamist muutunud mängijad.
+    
+    Kirjed on (väärtus, -pesa, mängija) kahanevas järjekorras; pesa on lisamise järjekord,
+    nii et võrdsete väärtuste korral on eespool varem lisatud mängija nagu Leaderboard'is.
+    """
+    
+    def __init__(self, size, entries):
+        """
+        Lähtesta edetabel.
+        
+        Args:
+            size (int): Meeles peetavate kohtade arv
+            entries (list): Kuni size parimat kirjet kahanevas järjekorras
+        """
+        self.size = size
+        self.entries = entries
+        self.changed = set()
+
+
+class CompactStore:
+    """
+    Mängude ja mängijate loendurid kompaktsel kujul.
+    
+    Mängijate nimed on ühes baidimassiivis ja asendatakse täisarvuliste id-dega. Iga mängu
+    osalejad, võitjad, kaotajad ja punktisummad on _PlayerSlots'is: mängija id järgi
+    sorteeritud võtmeplokid, mis annavad mängija pesa. Pesa näitab väärtuse kohta
+    loendurimassiivis ja on ühtlasi sõnastiku lisamisjärjekord, millest sõltub võrdsete
+    tulemuste valik. Osalejate pesa on kogu hoidla paari järjekorranumber, nii et mängija
+    mängude järjekord on tema paaride järjekord. Paari kohta kulub seega 8 baiti võtmele
+    ja tavaliselt 1 bait loendurile, ilma paisktabeli ja Pythoni objektideta.
+    
+    Edetabelitest hoitakse meeles ainult esimesed kohad. Pärast uusi mängukordi arvutatakse
+    need päringul ümber ainult muutunud mängijate põhjal; kogu mäng läbitakse ainult siis,
+    kui keegi senisest tipust langes või muutunud mängijaid on palju.
+    
+    Kohtumiste indeks (HeadToHead) ei ole kompaktne ja jääb sõnastikeks.
+    """
+    
+    # Vähim edetabelis meeles peetavate kohtade arv
+    _LEADERBOARD_SIZE = 16
+    
+    # Edetabel -> (mängija pesade loend, väärtuste loend, kas jagada mängukordade arvuga)
+    _LEADERBOARDS = {
+        "wins": ("game_winners", "win_counts", False),
+        "win_rate": ("game_winners", "win_counts", True),
+        "losses": ("game_losers", "loss_counts", False),
+        "loss_rate": ("game_losers", "loss_counts", True),
+        "scores": ("game_scorers", "high_scores", False),
+    }
+    
+    def __init__(self):
+        """Lähtesta tühi hoidla."""
+        self.player_names = _NameTable()
+        self.game_names = []
+        self.game_ids = {}
+        
+        # Mängude kaupa
+        self.play_counts = array.array("q")
+        self.player_counts = []
+        self.game_players = []
+        self.game_winners = []
+        self.win_counts = []
+        self.game_losers = []
+        self.loss_counts = []
+        self.game_scorers = []
+        self.high_scores = []
+        self.leaderboards = []
+        
+        # Mängijate kaupa
+        self.player_wins = array.array("i")
+        self.player_losses = array.array("i")
+        self.player_seen = bytearray()
+        self.players_order = array.array("i")
+        
+        # Paaride kaupa
+        self.plays = _NarrowInts("B")
+    
+    def add_play(self, play):
+        """
+        Salvesta üks parsitud mängukord.
+        
+        Args:
+            play (Play): Mängukord koos arvutatud võitjate ja kaotajatega
+        """
+        game = self._game_id(play.game_name)
+        self.play_counts[game] += 1
+        player_counts = self.player_counts[game]
+        player_counts[len(play.players)] = player_counts.get(len(play.players), 0) + 1
+        
+        # Mängija kaotab ainult siis, kui tema nimi on viimane tulemus
+        loser = play.results[-1] if play.result_type in ("points", "places") else None
+        game_players = self.game_players[game]
+        ids = {}
+        for name in play.players:
+            player = ids[name] = self._player_id(name)
+            if not self.player_seen[player]:
+                self.player_seen[player] = 1
+                self.players_order.append(player)
+            pair = game_players.setdefault(player, len(self.plays.values))
+            if pair == len(self.plays.values):
+                self.plays.append(0)
+            self.plays.increment(pair)
+            if name in play.winners:
+                self.player_wins[player] += 1
+            if name == loser:
+                self.player_losses[player] += 1
+        
+        for name in play.winners:
+            if name not in ids:
+                ids[name] = self._player_id(name)
+            self._count(self.game_winners[game], self.win_counts[game], ids[name])
+        for name in play.losers:
+            if name not in ids:
+                ids[name] = self._player_id(name)
+            self._count(self.game_losers[game], self.loss_counts[game], ids[name])
+        
+        if play.scores is not None:
+            scorers, high_scores = self.game_scorers[game], self.high_scores[game]
+            for name, score in zip(play.players, play.scores):
+                slot = scorers.setdefault(ids[name], len(high_scores.values))
+                if slot == len(high_scores.values):
+                    high_scores.append(score)
+                elif high_scores[slot] < score:
+                    high_scores[slot] = score
+        
+        leaderboards = self.leaderboards[game]
+        for metric, leaderboard in list(leaderboards.items()):
+            leaderboard.changed.update(ids.values())
+            # Paljude muutuste korral on kogu mängu läbimine odavam kui ümberarvutus
+            if len(leaderboard.changed) > 4 * leaderboard.size:
+                del leaderboards[metric]
+    
+    def player_games(self, player):
+        """
+        Leia mängija mängud esimese mängukorra järjekorras ajaga O(m log n).
+        
+        Args:
+            player (int): Mängija id
+            
+        Returns:
+            list: (mäng, paar) paarid, kus mäng on mängu id ja paar mängukordade loenduri indeks
+        """
+        found = []
+        for game, game_players in enumerate(self.game_players):
+            pair = game_players.get(player)
+            if pair >= 0:
+                found.append((pair, game))
+        found.sort()
+        return [(game, pair) for pair, game in found]
+    
+    def top(self, game, metric, k):
+        """
+        Leia mängu edetabeli k esimest mängijat.
+        
+        Args:
+            game (int): Mängu id
+            metric (str): Edetabel _LEADERBOARDS seast
+            k (int): Soovitud mängijate arv
+            
+        Returns:
+            list: Mängijate nimed väärtuse kahanemise järjekorras
+        """
+        leaderboards = self.leaderboards[game]
+        leaderboard = leaderboards.get(metric)
+        if leaderboard is None or k > leaderboard.size or not self._update_leaderboard(leaderboard, game, metric):
+            size = max(k, self._LEADERBOARD_SIZE)
+            leaderboard = leaderboards[metric] = _CompactLeaderboard(
+                size, heapq.nlargest(size, self._leaderboard_entries(game, metric)))
+        return [self.player_names[player] for _, _, player in leaderboard.entries[:k]]
+    
+    def player_rows(self):
+        """
+        Koosta kõigi mängijate read nagu Statistics.player_rows, läbides iga mängu võtmed ühe korra.
+        
+        Yields:
+            tuple: Ühe mängija rida PLAYER_COLUMNS järjekorras
+        """
+        players = len(self.player_names)
+        plays = array.array("q", [0]) * players
+        # Lemmikmäng on kõige rohkem mängitud mäng, võrdsete korral see, mida mängiti varem
+        favourite_plays = array.array("q", [0]) * players
+        favourite_pair = array.array("q", [-1]) * players
+        favourite_game = array.array("i", [-1]) * players
+        record_scores = {}
+        
+        for game, game_players in enumerate(self.game_players):
+            for key in game_players:
+                player, pair = key >> 32, key & _PlayerSlots._SLOT_MASK
+                count = self.plays[pair]
+                plays[player] += count
+                best = favourite_plays[player]
+                if count > best or count == best and pair < favourite_pair[player]:
+                    favourite_plays[player], favourite_pair[player], favourite_game[player] = count, pair, game
+            high_scores = self.high_scores[game]
+            for key in self.game_scorers[game]:
+                player, score = key >> 32, high_scores[key & _PlayerSlots._SLOT_MASK]
+                if player not in record_scores or record_scores[player] < score:
+                    record_scores[player] = score
+        
+        for player in self.players_order:
+            wins = self.player_wins[player]
+            favourite = self.game_names[favourite_game[player]] if favourite_game[player] >= 0 else None
+            yield (self.player_names[player], plays[player], wins, self.player_losses[player],
+                   wins / plays[player] if plays[player] else 0.0, favourite, record_scores.get(player))
+    
+    def to_state(self):
+        """
+        Anna hoidla sisu hetkepildi jaoks baitide, loendite ja sõnastikena.
+        
+        Returns:
+            dict: Nimed, mängude ja mängijate loendurid ning edetabelite esimesed kohad
+        """
+        return {
+            "player_names": self.player_names.to_state(),
+            "game_names": list(self.game_names),
+            "play_counts": self.play_counts.tobytes(),
+            "player_counts": [dict(counts) for counts in self.player_counts],
+            "game_players": [slots.to_state() for slots in self.game_players],
+            "game_winners": [slots.to_state() for slots in self.game_winners],
+            "win_counts": [counts.to_state() for counts in self.win_counts],
+            "game_losers": [slots.to_state() for slots in self.game_losers],
+            "loss_counts": [counts.to_state() for counts in self.loss_counts],
+            "game_scorers": [slots.to_state() for slots in self.game_scorers],
+            "high_scores": [scores.to_state() for scores in self.high_scores],
+            "leaderboards": [{metric: (leaderboard.size, leaderboard.entries, list(leaderboard.changed))
+                              for metric, leaderboard in leaderboards.items()}
+                             for leaderboards in self.leaderboards],
+            "player_wins": self.player_wins.tobytes(),
+            "player_losses": self.player_losses.tobytes(),
+            "player_seen": bytes(self.player_seen),
+            "players_order": self.players_order.tobytes(),
+            "plays": self.plays.to_state(),
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """
+        Loo hoidla to_state() antud andmetest.
+        
+        Args:
+            state (dict): to_state() tulemus
+            
+        Returns:
+            CompactStore: Taastatud hoidla
+        """
+        store = cls()
+        store.player_names = _NameTable.from_state(state["player_names"])
+        store.game_names = state["game_names"]
+        store.game_ids = {name: game for game, name in enumerate(store.game_names)}
+        store.play_counts.frombytes(state["play_counts"])
+        store.player_counts = state["player_counts"]
+        for name in ("game_players", "game_winners", "game_losers", "game_scorers"):
+            setattr(store, name, [_PlayerSlots.from_state(slots) for slots in state[name]])
+        for name in ("win_counts", "loss_counts", "high_scores"):
+            setattr(store, name, [_NarrowInts.from_state(counts) for counts in state[name]])
+        for leaderboards in state["leaderboards"]:
+            store.leaderboards.append({})
+            for metric, (size, entries, changed) in leaderboards.items():
+                leaderboard = store.leaderboards[-1][metric] = _CompactLeaderboard(size, entries)
+                leaderboard.changed.update(changed)
+        for name in ("player_wins", "player_losses", "players_order"):
+            getattr(store, name).frombytes(state[name])
+        store.player_seen = bytearray(state["player_seen"])
+        store.plays = _NarrowInts.from_state(state["plays"])
+        return store
+    
+    @classmethod
+    def from_objects(cls, players, games):
+        """
+        Loo hoidla tavarežiimi Player ja Game objektidest.
+        
+        Paarid nummerdatakse nii, et iga mängija mängude ja iga mängu mängijate
+        lisamisjärjekord säilib. Mõlemad järjekorrad tulenevad mängukordade järjekorrast,
+        seega paar võetakse siis, kui see on nii oma mängija kui ka oma mängu järgmine paar.
+        
+        Args:
+            players (dict): Mängija nimi -> Player esimese osalemise järjekorras
+            games (dict): Mängu nimi -> Game esimese mängukorra järjekorras
+            
+        Returns:
+            CompactStore: Samade tulemustega hoidla
+        """
+        store = cls()
+        ids = {}
+        for name, player_object in players.items():
+            player = ids[name] = store._player_id(name)
+            store.player_seen[player] = 1
+            store.players_order.append(player)
+            store.player_wins[player] = player_object.wins
+            store.player_losses[player] = player_object.losses
+        
+        game_queues = []
+        for name, game_object in games.items():
+            game = store._game_id(name)
+            store.play_counts[game] = game_object.play_count
+            store.player_counts[game] = dict(game_object.player_counts)
+            for slots, counts, values in ((store.game_winners, store.win_counts, game_object.wins),
+                                          (store.game_losers, store.loss_counts, game_object.losses),
+                                          (store.game_scorers, store.high_scores, game_object.high_scores)):
+                keys = array.array("q")
+                for player_name, value in values.items():
+                    player = ids.get(player_name)
+                    if player is None:
+                        player = ids[player_name] = store._player_id(player_name)
+                    keys.append(player << 32 | len(counts[game].values))
+                    counts[game].append(value)
+                slots[game] = _PlayerSlots.from_keys(array.array("q", sorted(keys)))
+            game_queues.append([(ids[player_name], count) for player_name, count in game_object.player_plays.items()])
+        
+        player_queues = [[] for _ in store.player_wins]
+        for name, player_object in players.items():
+            player_queues[ids[name]] = [store.game_ids[game_name] for game_name in player_object.games_played]
+        player_positions = array.array("q", [0]) * len(player_queues)
+        game_positions = array.array("q", [0]) * len(game_queues)
+        game_keys = [array.array("q") for _ in game_queues]
+        ready = [game for game, queue in enumerate(game_queues)
+                 if queue and player_queues[queue[0][0]][0] == game]
+        while ready:
+            game = ready.pop()
+            player, count = game_queues[game][game_positions[game]]
+            game_keys[game].append(player << 32 | len(store.plays.values))
+            store.plays.append(count)
+            game_positions[game] += 1
+            player_positions[player] += 1
+            
+            if player_positions[player] < len(player_queues[player]):
+                next_game = player_queues[player][player_positions[player]]
+                if game_queues[next_game][game_positions[next_game]][0] == player:
+                    ready.append(next_game)
+            if game_positions[game] < len(game_queues[game]):
+                next_player = game_queues[game][game_positions[game]][0]
+                if player_queues[next_player][player_positions[next_player]] == game:
+                    ready.append(game)
+        if len(store.plays) != sum(map(len, game_queues)):
+            raise ValueError("Mängijate mängud ja mängude mängijad on omavahel vastuolus")
+        store.game_players = [_PlayerSlots.from_keys(array.array("q", sorted(keys))) for keys in game_keys]
+        return store
+    
+    def prepare_leaderboards(self):
+        """Arvuta kõigi mängude kõigi edetabelite esimesed kohad, nii et järgmised päringud neid ei koosta."""
+        for game in range(len(self.game_names)):
+            for metric in self._LEADERBOARDS:
+                self.top(game, metric, 1)
+    
+    def _count(self, slots, counts, player):
+        """Suurenda mängija loendurit, vajadusel lisades mängija."""
+        slot = slots.setdefault(player, len(counts.values))
+        if slot == len(counts.values):
+            counts.append(0)
+        counts.increment(slot)
+    
+    def _leaderboard_entry(self, game, metric, player, slot=None):
+        """
+        Koosta mängija edetabelikirje.
+        
+        Args:
+            game (int): Mängu id
+            metric (str): Edetabel _LEADERBOARDS seast
+            player (int): Mängija id
+            slot (int): Mängija pesa edetabeli loendis, kui see on juba teada
+            
+        Returns:
+            tuple või None: (väärtus, -pesa, mängija) või None, kui mängija pole edetabelis
+        """
+        slots_name, values_name, rate = self._LEADERBOARDS[metric]
+        if slot is None:
+            slot = getattr(self, slots_name)[game].get(player)
+            if slot < 0:
+                return None
+        value = getattr(self, values_name)[game][slot]
+        if rate:
+            pair = self.game_players[game].get(player)
+            if pair < 0:
+                return None
+            value /= self.plays[pair]
+        return value, -slot, player
+    
+    def _leaderboard_entries(self, game, metric):
+        """Koosta kõigi mängu edetabelis olevate mängijate kirjed."""
+        slots_name, _, _ = self._LEADERBOARDS[metric]
+        for key in getattr(self, slots_name)[game]:
+            entry = self._leaderboard_entry(game, metric, key >> 32, key & _PlayerSlots._SLOT_MASK)
+            if entry is not None:
+                yield entry
+    
+    def _update_leaderboard(self, leaderboard, game, metric):
+        """
+        Arvuta edetabeli esimesed kohad senise tipu ja muutunud mängijate põhjal.
+        
+        Muutumata mängijad väljaspool tippu ei ole paremad senisest viimasest kohast,
+        seega on tulemus täpne, kui uus viimane koht pole sellest halvem.
+        
+        Args:
+            leaderboard (_CompactLeaderboard): Uuendatav edetabel
+            game (int): Mängu id
+            metric (str): Edetabel _LEADERBOARDS seast
+            
+        Returns:
+            bool: Kas edetabel on täpne; kui ei, tuleb see kogu mängu põhjal uuesti koostada
+        """
+        changed = leaderboard.changed
+        if not changed:
+            return True
+        candidates = {entry[2]: entry for entry in leaderboard.entries if entry[2] not in changed}
+        for player in changed:
+            entry = self._leaderboard_entry(game, metric, player)
+            if entry is not None:
+                candidates[player] = entry
+        entries = heapq.nlargest(leaderboard.size, candidates.values())
+        if len(leaderboard.entries) == leaderboard.size and (
+                len(entries) < leaderboard.size or entries[-1] < leaderboard.entries[-1]):
+            return False
+        leaderboard.entries = entries
+        changed.clear()
+        return True
+    
+    def _player_id(self, name):
+        """Leia mängija id, vajadusel lisades mängija."""
+        player = self.player_names.add(name)
+        if player == len(self.player_wins):
+            self.player_wins.append(0)
+            self.player_losses.append(0)
+            self.player_seen.append(0)
+        return player
+    
+    def _game_id(self, name):
+        """Leia mängu id, vajadusel lisades mängu."""
+        game = self.game_ids.get(name)
+        if game is None:
+            game = self.game_ids[name] = len(self.game_names)
+            self.game_names.append(name)
+            self.play_counts.append(0)
+            self.player_counts.append({})
+            self.game_players.append(_PlayerSlots())
+            self.game_winners.append(_PlayerSlots())
+            self.win_counts.append(_NarrowInts("B"))
+            self.game_losers.append(_PlayerSlots())
+            self.loss_counts.append(_NarrowInts("B"))
+            self.game_scorers.append(_PlayerSlots())
+            self.high_scores.append(_NarrowInts("h"))
+            self.leaderboards.append({})
+        return game
+
+
+class _PairCounter(collections.abc.Mapping):
+    """Ühe mängu loendur sõnastikuna, võtmed on mängijate nimed lisamisjärjekorras."""
+    
+    def __init__(self, store, slots, values):
+        """
+        Lähtesta vaade.
+        
+        Args:
+            store (CompactStore): Andmete hoidla
+            slots (_PlayerSlots): Mängija -> pesa vastavus
+            values: Väärtused pesade kaupa
+        """
+        self._store = store
+        self._slots = slots
+        self._values = values
+    
+    def __getitem__(self, name):
+        """Anna mängija väärtus ajaga O(log n); KeyError, kui mängijal väärtust pole."""
+        player = self._store.player_names.find(name)
+        slot = self._slots.get(player) if player >= 0 else -1
+        if slot < 0:
+            raise KeyError(name)
+        return self._values[slot]
+    
+    def __iter__(self):
+        """Käi mängijate nimed läbi nende lisamise järjekorras."""
+        names = self._store.player_names
+        return (names[player] for player in self._slots.players())
+    
+    def __len__(self):
+        """Anna mängijate arv."""
+        return len(self._slots)
+
+
+class _GamesPlayed(collections.abc.Mapping):
+    """Mängija mängukordade arv mängude kaupa, võtmed on mängude nimed lisamisjärjekorras."""
+    
+    def __init__(self, store, player):
+        """
+        Lähtesta vaade.
+        
+        Args:
+            store (CompactStore): Andmete hoidla
+            player (int): Mängija id
+        """
+        self._store = store
+        self._player = player
+    
+    def __getitem__(self, name):
+        """Anna mängija mängukordade arv mängus; KeyError, kui ta seda ei mänginud."""
+        game = self._store.game_ids.get(name)
+        pair = -1 if game is None else self._store.game_players[game].get(self._player)
+        if pair < 0:
+            raise KeyError(name)
+        return self._store.plays[pair]
+    
+    def __iter__(self):
+        """Käi mängude nimed läbi mängija esimese mängukorra järjekorras."""
+        names = self._store.game_names
+        return (names[game] for game, _ in self._store.player_games(self._player))
+    
+    def __len__(self):
+        """Anna mängija mängitud mängude arv."""
+        return len(self._store.player_games(self._player))
+
+
+class CompactPlayer:
+    """Mängija vaade CompactStore andmetele sama liidesega nagu Player."""
+    
+    def __init__(self, store, player):
+        """
+        Lähtesta vaade.
+        
+        Args:
+            store (CompactStore): Andmete hoidla
+            player (int): Mängija id
+        """
+        self._store = store
+        self._player = player
+        self.name = store.player_names[player]
+        self.games_played = _GamesPlayed(store, player)
+    
+    @property
+    def wins(self):
+        """Mängija võitude arv."""
+        return self._store.player_wins[self._player]
+    
+    @property
+    def losses(self):
+        """Mängija kaotuste arv."""
+        return self._store.player_losses[self._player]
+    
+    def favourite_game(self):
+        """
+        Määra mängija kõige sagedamini mängitud mäng.
+        
+        Returns:
+            str või None: Kõige rohkem mängitud mängu nimi või None kui mänge pole mängitud
+        """
+        plays = self._store.plays
+        games = self._store.player_games(self._player)
+        if not games:
+            return None
+        game, _ = max(games, key=lambda game_pair: plays[game_pair[1]])
+        return self._store.game_names[game]
+
+
+class CompactGame:
+    """Mängu vaade CompactStore andmetele sama liidesega nagu Game."""
+    
+    def __init__(self, store, game):
+        """
+        Lähtesta vaade.
+        
+        Args:
+            store (CompactStore): Andmete hoidla
+            game (int): Mängu id
+        """
+        self._store = store
+        self._game = game
+        self.name = store.game_names[game]
+        self.player_counts = store.player_counts[game]
+        self.player_plays = _PairCounter(store, store.game_players[game], store.plays)
+        self.wins = _PairCounter(store, store.game_winners[game], store.win_counts[game])
+        self.losses = _PairCounter(store, store.game_losers[game], store.loss_counts[game])
+        self.high_scores = _PairCounter(store, store.game_scorers[game], store.high_scores[game])
+    
+    @property
+    def play_count(self):
+        """Mängukordade arv."""
+        return self._store.play_counts[self._game]
+    
+    def most_wins(self):
+        """Leia mängija, kellel on selles mängus kõige rohkem võite."""
+        return next(iter(self.top_winners(1)), None)
+    
+    def most_frequent_winner(self):
+        """Leia mängija, kellel on selles mängus kõrgeim võidumäär."""
+        return next(iter(self.top_frequent_winners(1)), None)
+    
+    def most_losses(self):
+        """Leia mängija, kellel on selles mängus kõige rohkem kaotusi."""
+        return next(iter(self.top_losers(1)), None)
+    
+    def most_frequent_loser(self):
+        """Leia mängija, kellel on selles mängus kõrgeim kaotuse määr."""
+        return next(iter(self.top_frequent_losers(1)), None)
+    
+    def record_holder(self):
+        """Leia mängija, kellel on selles mängus kõrgeim punktisumma."""
+        return next(iter(self.top_scores(1)), None)
+    
+    def top_winners(self, k):
+        """Leia k kõige rohkem võitnud mängijat."""
+        return self._store.top(self._game, "wins", k)
+    
+    def top_frequent_winners(self, k):
+        """Leia k kõrgeima võidumääraga mängijat."""
+        return self._store.top(self._game, "win_rate", k)
+    
+    def top_losers(self, k):
+        """Leia k kõige rohkem kaotanud mängijat."""
+        return self._store.top(self._game, "losses", k)
+    
+    def top_frequent_losers(self, k):
+        """Leia k kõrgeima kaotuse määraga mängijat."""
+        return self._store.top(self._game, "loss_rate", k)
+    
+    def top_scores(self, k):
+        """Leia k kõrgeima punktisummaga mängijat."""
+        return self._store.top(self._game, "scores", k)
+
+
+class _CompactPlayers(collections.abc.Mapping):
+    """Statistics.players kompaktses režiimis: mängijad esimese osalemise järjekorras."""
+    
+    def __init__(self, store):
+        """
+        Lähtesta vaade.
+        
+        Args:
+            store (CompactStore): Andmete hoidla
+        """
+        self._store = store
+    
+    def __getitem__(self, name):
+        """Anna mängija vaade; KeyError, kui mängija pole üheski mängukorras osalenud."""
+        player = self._store.player_names.find(name)
+        if player < 0 or not self._store.player_seen[player]:
+            raise KeyError(name)
+        return CompactPlayer(self._store, player)
+    
+    def __iter__(self):
+        """Käi mängijate nimed läbi esimese osalemise järjekorras."""
+        names = self._store.player_names
+        return (names[player] for player in self._store.players_order)
+    
+    def __len__(self):
+        """Anna mängijate arv."""
+        return len(self._store.players_order)
+
+
+class _CompactGames(collections.abc.Mapping):
+    """Statistics.games kompaktses režiimis: mängud esimese mängukorra järjekorras."""
+    
+    def __init__(self, store):
+        """
+        Lähtesta vaade.
+        
+        Args:
+            store (CompactStore): Andmete hoidla
+        """
+        self._store = store
+    
+    def __getitem__(self, name):
+        """Anna mängu vaade; KeyError, kui mängu pole."""
+        game = self._store.game_ids.get(name)
+        if game is None:
+            raise KeyError(name)
+        return CompactGame(self._store, game)
+    
+    def __iter__(self):
+        """Käi mängude nimed läbi esimese mängukorra järjekorras."""
+        return iter(self._store.game_names)
+    
+    def __len__(self):
+        """Anna mängude arv."""
+        return len(self._store.game_names)
+
+
+class HeadToHead:
+    """
+    Mängijate omavaheliste kohtumiste indeks.
+    
+    Iga mängijapaari kohta, kes on kunagi koos mänginud, hoitakse mängude kaupa ja
+    kokku kohtumiste arvu ning kummagi võitude arvu teise üle. Mängija võidab teist,
+    kui ta on mängukorra võitjate seas ja teine mitte.
+    """
+    
+    def __init__(self):
+        """Lähtesta tühi indeks."""
+        self._pairs = {}
+    
+    def add_play(self, play):
+        """
+        Salvesta ühe mängukorra kohtumised.
+        
+        Args:
+            play (Play): Parsitud mängukord
+        """
+        players = list(dict.fromkeys(play.players))
+        winners = set(play.winners)
+        for index, first in enumerate(players):
+            for second in players[index + 1:]:
+                key = (first, second) if first < second else (second, first)
+                first_won = key[0] in winners
+                second_won = key[1] in winners
+                games = self._pairs.get(key)
+                if games is None:
+                    games = self._pairs[key] = {None: [0, 0, 0]}
+                if play.game_name not in games:
+                    games[play.game_name] = [0, 0, 0]
+                for record in (games[None], games[play.game_name]):
+                    record[0] += 1
+                    if first_won and not second_won:
+                        record[1] += 1
+                    elif second_won and not first_won:
+                        record[2] += 1
+    
+    def merge(self, other):
+        """
+        Lisa teise indeksi kohtumised selle omadele.
+        
+        Args:
+            other (HeadToHead): Hilisemate mängukordade indeks
+        """
+        for key, other_games in other._pairs.items():
+            games = self._pairs.setdefault(key, {})
+            for game_name, other_record in other_games.items():
+                record = games.setdefault(game_name, [0, 0, 0])
+                for index, count in enumerate(other_record):
+                    record[index] += count
+    
+    def to_state(self):
+        """
+        Anna indeks hetkepildi jaoks.
+        
+        Returns:
+            dict: Mängijapaar -> mängu nimi (kokkuvõttel None) -> [kohtumised, esimese võidud, teise võidud]
+        """
+        return self._pairs
+    
+    @classmethod
+    def from_state(cls, state):
+        """
+        Loo indeks to_state() antud andmetest.
+        
+        Args:
+            state (dict): to_state() tulemus
+            
+        Returns:
+            HeadToHead: Taastatud indeks
+        """
+        head_to_head = cls()
+        head_to_head._pairs = state
+        return head_to_head
+    
+    def get(self, player, opponent, game_name=None):
+        """
+        Leia mängija tulemused vastase vastu ajaga O(1).
+        
+        Args:
+            player (str): Mängija nimi
+            opponent (str): Vastase nimi
+            game_name (str): Mängu nimi; kui puudub, antakse kõigi mängude kokkuvõte
+            
+        Returns:
+            dict: Kohtumiste ("encounters"), võitude ("wins") ja kaotuste ("losses") arv
+        """
+        key = (player, opponent) if player < opponent else (opponent, player)
+        encounters, first_wins, second_wins = self._pairs.get(key, {}).get(game_name, (0, 0, 0))
+        if key[0] != player:
+            first_wins, second_wins = second_wins, first_wins
+        return {"encounters": encounters, "wins": first_wins, "losses": second_wins}
+
+
+class LoadProfile:
+    """
+    Logi laadimise mõõdikud.
+    
+    Etappide ajad on sekundites: faili lugemine ("read"), dekodeerimine ("decode"),
+    rea tükeldamine ja arvuteisendus ("split"), mängu uuendamine ("game") ning
+    mängijate uuendamine ("players").
+    """
+    
+    STAGES = ("read", "decode", "split", "game", "players")
+    
+    def __init__(self):
+        """Lähtesta nullitud mõõdikud."""
+        self.lines = 0
+        self.bytes_read = 0
+        self.malformed_lines = 0
+        self.elapsed = 0.0
+        self.stage_seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.peak_players = 0
+        self.peak_games = 0
+    
+    @property
+    def lines_per_second(self):
+        """Loetud ridade arv sekundis."""
+        return self.lines / self.elapsed if self.elapsed else 0.0
+    
+    def merge(self, other):
+        """
+        Lisa teise laadimise mõõdikud nendele, näiteks paralleelse laadimise osadest.
+        
+        Args:
+            other (LoadProfile): Teise laadimise mõõdikud
+        """
+        self.lines += other.lines
+        self.bytes_read += other.bytes_read
+        self.malformed_lines += other.malformed_lines
+        for stage, seconds in other.stage_seconds.items():
+            self.stage_seconds[stage] += seconds
+
+
+class QueryProfile:
+    """
+    get() päringute mõõdikud teetüüpide kaupa.
+    
+    Teetüüp on tee esimene osa ja pärimise liik, näiteks "game/*/most-wins".
+    Latentsuse histogrammi korvide ülemised piirid on BUCKETS sekundites,
+    viimane korv on kõigi pikemate päringute jaoks.
+    """
+    
+    BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+    
+    def __init__(self):
+        """Lähtesta nullitud mõõdikud."""
+        self.calls = collections.Counter()
+        self.hits = collections.Counter()
+        self.histograms = {}
+    
+    def record(self, route, hit, seconds):
+        """
+        Salvesta üks päring.
+        
+        Args:
+            route (str): Teetüüp
+            hit (bool): Kas tulemus tuli puhvrist
+            seconds (float): Päringu kestus
+        """
+        self.calls[route] += 1
+        if hit:
+            self.hits[route] += 1
+        histogram = self.histograms.get(route)
+        if histogram is None:
+            histogram = self.histograms[route] = [0] * (len(self.BUCKETS) + 1)
+        histogram[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+    
+    def hit_rate(self, route=None):
+        """
+        Leia puhvri tabamuste osakaal.
+        
+        Args:
+            route (str): Teetüüp; kui puudub, arvestatakse kõiki päringuid
+            
+        Returns:
+            float: Tabamuste osakaal vahemikus 0 kuni 1
+        """
+        calls = self.calls[route] if route else sum(self.calls.values())
+        hits = self.hits[route] if route else sum(self.hits.values())
+        return hits / calls if calls else 0.0
+
+
+class StatisticsProfile:
+    """
+    Statistics mõõdikud koos valikulise tagasikutsega.
+    
+    Tagasikutse saab sündmuse nime ja andmed: "load" koos LoadProfile'iga pärast
+    iga laadimist ning "query" koos (teetüüp, tabamus, kestus) kolmikuga pärast
+    iga get() kutset.
+    """
+    
+    def __init__(self, callback=None):
+        """
+        Lähtesta mõõdikud.
+        
+        Args:
+            callback: Funktsioon callback(event, data) või None
+        """
+        self.load = LoadProfile()
+        self.queries = QueryProfile()
+        self.callback = callback
+    
+    def emit(self, event, data):
+        """
+        Edasta sündmus tagasikutsele, kui see on määratud.
+        
+        Args:
+            event (str): Sündmuse nimi
+            data: Sündmuse andmed
+        """
+        if self.callback is not None:
+            self.callback(event, data)
+
+
+def _complete_lines_end(file):
+    """
+    Leia faili viimase reavahetuse järgne nihe, pooleli olevat viimast rida arvestamata.
+    
+    Args:
+        file: Baidirežiimis avatud fail
+        
+    Returns:
+        int: Reavahetusega lõppevate ridade kogupikkus baitides
+    """
+    end = file.seek(0, os.SEEK_END)
+    while end:
+        start = max(0, end - _BLOCK_SIZE)
+        file.seek(start)
+        newline = file.read(end - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+def _lines_size(text, count):
+    """
+    Leia teksti esimese count rea pikkus UTF-8 baitides.
+    
+    Args:
+        text (str): Dekodeeritud read
+        count (int): Ridade arv
+        
+    Returns:
+        int: Ridade kogupikkus koos reavahetustega
+    """
+    lines = itertools.islice(io.StringIO(text, newline=""), count)
+    return len("".join(lines).encode("utf-8"))
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Hetkepildi lugeja, mis lubab ainult sisseehitatud andmetüüpe ega loo ühtegi klassi."""
+    
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Hetkepilt ei tohi sisaldada objekti {module}.{name}")
+
+
+def _chunk_boundaries(filename, chunks):
+    """
+    Jaga fail ligikaudu võrdseteks baidivahemikeks, mille piirid on ridade alguses.
+    
+    Args:
+        filename (str): Faili asukoht
+        chunks (int): Soovitud tükkide arv
+        
+    Returns:
+        list: Kasvavad baidinihked alates 0-st kuni viimase reavahetuse järgse nihkeni
+    """
+    boundaries = [0]
+    with open(filename, "rb") as file:
+        size = _complete_lines_end(file)
+        for chunk in range(1, chunks):
+            offset = size * chunk // chunks
+            if offset <= boundaries[-1]:
+                continue
+            file.seek(offset - 1)
+            file.readline()
+            if boundaries[-1] < file.tell() < size:
+                boundaries.append(file.tell())
+    boundaries.append(size)
+    return boundaries
+
+
+def _load_chunk(filename, start, end, options):
+    """
+    Loe faili baidivahemik osaliseks statistikaks.
+    
+    Args:
+        filename (str): Faili asukoht
+        start (int): Vahemiku algus, rea algus
+        end (int): Vahemiku lõpp, rea algus või faili lõpp
+        options (dict): Osalise Statistics objekti võtmesõnaargumendid
+        
+    Returns:
+        Statistics: Vahemiku mängukordade statistika
+    """
+    partial = Statistics(**options)
+    with open(filename, "rb") as file:
+        file.seek(start)
+        read_start = time.perf_counter()
+        data = file.read(end - start)
+        if partial.profile is not None:
+            partial.profile.load.stage_seconds["read"] += time.perf_counter() - read_start
+            partial.profile.load.bytes_read += len(data)
+    partial._add_lines(data)
+    return partial
+
+
+def _columns(names, rows, use_numpy):
+    """
+    Pööra read veergudeks.
+    
+    NumPy kasutamisel on arvulised veerud arvumassiivid ning tekstid ja puuduvad
+    väärtused objektimassiivides.
+    
+    Args:
+        names (tuple): Veergude nimed
+        rows (iterable): Read, igas üks väärtus iga veeru kohta
+        use_numpy (bool): Kas anda veerud NumPy massiividena; None tähendab, kui NumPy on olemas
+        
+    Returns:
+        dict: Veeru nimi -> veeru väärtused
+    """
+    if use_numpy and numpy is None:
+        raise ImportError("NumPy ei ole paigaldatud")
+    columns = [list(column) for column in zip(*rows)] or [[] for _ in names]
+    if use_numpy is False or numpy is None:
+        return dict(zip(names, columns))
+    
+    arrays = {}
+    for name, column in zip(names, columns):
+        if all(isinstance(value, (int, float)) for value in column):
+            arrays[name] = numpy.asarray(column)
+        else:
+            arrays[name] = numpy.asarray(column, dtype=object)
+    return arrays
+
+
+class Statistics:
+    """
+    Keskne klass mängustatistika haldamiseks andmefailist.
+    Pakub meetodeid mitmesuguste statistikate pärimiseks mängude ja mängijate kohta.
+    """
+    
+    _PLAYER_INFO = {
+        "amount": lambda player: sum(player.games_played.values()),
+        "favourite": lambda player: player.favourite_game(),
+        "won": lambda player: player.wins,
+    }
+    
+    _GAME_INFO = {
+        "amount": lambda game: game.play_count,
+        "player-amount": lambda game: max(game.player_counts, key=game.player_counts.get, default=0),
+        "most-wins": lambda game: game.most_wins(),
+        "most-frequent-winner": lambda game: game.most_frequent_winner(),
+        "most-losses": lambda game: game.most_losses(),
+        "most-frequent-loser": lambda game: game.most_frequent_loser(),
+        "record-holder": lambda game: game.record_holder(),
+    }
+    
+    _GAME_TOP = {
+        "top-winners": lambda game, k: game.top_winners(k),
+        "top-frequent-winners": lambda game, k: game.top_frequent_winners(k),
+        "top-losers": lambda game, k: game.top_losers(k),
+        "top-frequent-losers": lambda game, k: game.top_frequent_losers(k),
+        "top-scores": lambda game, k: game.top_scores(k),
+    }
+    
+    def __init__(self, filename=None, workers=None, cache_size=1024, compact=False, head_to_head=False,
+                 skip_malformed=False, profile=None):
+        """
+        Lähtesta statistika, lugedes andmeid failist.
+        
+        Loetakse ka reavahetuseta viimane rida. Kui see hiljem reavahetusega lõpetatakse,
+        ei lisa refresh() seda teist korda.
+        
+        Kompaktses režiimis hoitakse loendurid CompactStore massiivides ning players ja
+        games sisaldavad Player ja Game asemel nende õhukesi vaateid. get() tulemused on samad.
+        Loendurite mälu väheneb üle 10 korra (vt CompactStore), laadimine on veidi aeglasem.
+        head_to_head indeks ei vähene.
+        
+        Args:
+            filename (str): Mänguandmeid sisaldava faili asukoht; kui puudub, on statistika tühi
+            workers (int): Protsesside arv faili paralleelseks lugemiseks (vaikimisi loetakse ühes protsessis)
+            cache_size (int): Meeles peetavate get() tulemuste suurim arv
+            compact (bool): Kas hoida statistikat kompaktses režiimis
+            head_to_head (bool): Kas koostada mängijate omavaheliste kohtumiste indeks
+            skip_malformed (bool): Kas jätta vigased read vahele, selle asemel et erind tõsta
+            profile (StatisticsProfile või bool): Mõõdikute kogumine; True loob uue StatisticsProfile'i,
+                vaikimisi mõõdikuid ei koguta
+        """
+        if compact and workers and workers > 1:
+            raise ValueError("Kompaktset statistikat ei saa paralleelselt laadida")
+        self._store = CompactStore() if compact else None
+        self.players = _CompactPlayers(self._store) if compact else {}
+        self.games = _CompactGames(self._store) if compact else {}
+        self.head_to_head = HeadToHead() if head_to_head else None
+        self.skip_malformed = skip_malformed
+        self.profile = StatisticsProfile() if profile is True else profile or None
+        self.total_games = 0
+        self.result_type_counts = collections.defaultdict(int)
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._version = 0
+        self._cache_version = 0
+        self.filename = filename
+        self.offset = 0
+        self._tail = None
+        
+        if filename is None:
+            return
+        started = time.perf_counter()
+        if workers and workers > 1:
+            self._load_parallel(filename, workers)
+        else:
+            self._read_new_lines(complete_only=False)
+        if self.profile is not None:
+            self._finish_load_profile(started)
+    
+    def save_snapshot(self, path):
+        """
+        Salvesta kogu statistika versioonitud binaarsesse hetkepilti.
+        
+        Hetkepilt sisaldab alati CompactStore paigutust: loendurite massiivide baite,
+        mida laadimisel ei parsita, ja kõigi mängude edetabelite esimesi kohti, nii et
+        esimesed päringud neid ei koosta. Tavarežiimi statistika teisendatakse selleks
+        salvestamisel. Vorming sõltub ainult to_state() meetoditest ja SNAPSHOT_VERSION'ist.
+        Hetkepilt sisaldab ka logifaili baidinihet, nii et pärast laadimist saab
+        refresh() abil lisada ainult hiljem kirjutatud read. Fail kirjutatakse
+        kõrvale ja nimetatakse siis ümber, nii et lugejad ei näe poolikut faili.
+        
+        Args:
+            path (str): Hetkepildi faili asukoht
+        """
+        store = self._store if self._store is not None else CompactStore.from_objects(self.players, self.games)
+        store.prepare_leaderboards()
+        state = {
+            "store": store.to_state(),
+            "total_games": self.total_games,
+            "result_type_counts": dict(self.result_type_counts),
+            "filename": self.filename,
+            "offset": self.offset,
+            "tail": self._tail,
+            "head_to_head": None if self.head_to_head is None else self.head_to_head.to_state(),
+        }
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+    
+    @classmethod
+    def load_snapshot(cls, path, filename=None, cache_size=1024, head_to_head=None, skip_malformed=False,
+                      profile=None):
+        """
+        Loo statistika hetkepildist ja lisa logifaili pärast hetkepilti kirjutatud read.
+        
+        Hetkepilt loetakse mälukaardistatuna ilma logiridu parsimata ning loendurite
+        massiivid kopeeritakse otse baitidest, seega on taastatud statistika alati
+        kompaktses režiimis. Kohtumiste indeks taastatakse sõnastikena ja võtab selle
+        olemasolul suurema osa laadimise ajast. Lugeja lubab ainult sisseehitatud andmetüüpe, nii et hetkepilt
+        ei saa laadimisel koodi käivitada, kuid selle sisu usaldatakse: käsitsi muudetud
+        loendurid annavad valed tulemused.
+        
+        Args:
+            path (str): save_snapshot() loodud faili asukoht
+            filename (str): Sama logifaili asukoht, kui see on hetkepildi omast erinev;
+                kui logi pole olemas, uusi ridu ei lisata
+            cache_size (int): Meeles peetavate get() tulemuste suurim arv
+            head_to_head (bool): Kas taastada kohtumiste indeks; vaikimisi taastatakse, kui see on hetkepildis
+            skip_malformed (bool): Kas jätta uute ridade seas vigased read vahele, selle asemel et erind tõsta
+            profile (StatisticsProfile või bool): Uute ridade lugemise mõõdikud nagu konstruktoris
+            
+        Returns:
+            Statistics: Taastatud statistika
+            
+        Raises:
+            ValueError: Kui fail pole toetatud versiooni hetkepilt või head_to_head on True,
+                kuid hetkepildis indeksit pole
+        """
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version = _SNAPSHOT_HEADER.unpack_from(mapped)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} ei ole mängustatistika hetkepilt")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"{path} on hetkepildi versioonis {version}, toetatud on ainult versioon "
+                                 f"{SNAPSHOT_VERSION}; loo hetkepilt logifailist uuesti")
+            mapped.seek(_SNAPSHOT_HEADER.size)
+            state = _SnapshotUnpickler(mapped).load()
+        if head_to_head and state["head_to_head"] is None:
+            raise ValueError(f"{path} ei sisalda kohtumiste indeksit; loo hetkepilt head_to_head=True korral")
+        
+        statistics = cls(cache_size=cache_size, skip_malformed=skip_malformed, profile=profile)
+        statistics._store = CompactStore.from_state(state["store"])
+        statistics.players = _CompactPlayers(statistics._store)
+        statistics.games = _CompactGames(statistics._store)
+        statistics.total_games = state["total_games"]
+        statistics.result_type_counts.update(state["result_type_counts"])
+        statistics.filename = filename or state["filename"]
+        statistics.offset = state["offset"]
+        statistics._tail = state["tail"]
+        if state["head_to_head"] is not None and head_to_head is not False:
+            statistics.head_to_head = HeadToHead.from_state(state["head_to_head"])
+        statistics._version += 1
+        
+        if statistics.filename and os.path.exists(statistics.filename):
+            statistics.refresh()
+        return statistics
+    
+    def refresh(self):
+        """
+        Loe logifaili lõppu pärast eelmist lugemist lisatud read.
+        
+        Loetakse ainult reavahetusega lõppevad read, pooleli olev viimane rida jääb
+        järgmiseks korraks. Fail peab olema ainult lõppu kirjutatav. Konstruktori loetud
+        reavahetuseta viimast rida ei lisata uuesti, kui see on nüüd reavahetusega lõpetatud.
+        
+        Returns:
+            int: Lisatud mängukordade arv; 0, kui statistikal pole logifaili
+            
+        Raises:
+            ValueError: Kui konstruktori loetud reavahetuseta viimase rea lõppu on pärast
+                lugemist kirjutatud; see rida jäetakse vahele ja järgmine refresh() jätkab sellest edasi
+        """
+        if self.filename is None:
+            return 0
+        started = time.perf_counter()
+        added = self._read_new_lines(complete_only=True)
+        if self.profile is not None:
+            self._finish_load_profile(started)
+        return added
+    
+    def follow(self, interval=1.0):
+        """
+        Jälgi logifaili ja lisa uued read kohe, kui need ilmuvad.
+        
+        Args:
+            interval (float): Ooteaeg sekundites, kui uusi ridu pole
+            
+        Yields:
+            int: Lisatud mängukordade arv iga kord, kui midagi lisandus
+        """
+        while True:
+            added = self.refresh()
+            if added:
+                yield added
+            else:
+                time.sleep(interval)
+    
+    def _read_new_lines(self, complete_only):
+        """
+        Loe failist baidinihkest self.offset alates uued read.
+        
+        Vigase rea korral jääb self.offset selle rea algusesse, nii et pärast rea
+        parandamist jätkatakse sealt ja varem lisatud ridu teist korda ei lisata.
+        self.offset jääb alati reavahetuseta viimase rea algusesse; kui see rida
+        lisati, jäetakse see self._tail'i, et seda hiljem teist korda ei lisataks.
+        
+        Args:
+            complete_only (bool): Kas jätta reavahetuseta viimane rida lugemata
+            
+        Returns:
+            int: Lisatud mängukordade arv
+        """
+        added = 0
+        pending = b""
+        profile = self.profile
+        started = time.perf_counter()
+        with open(self.filename, "rb") as file:
+            file.seek(self.offset)
+            while True:
+                block = file.read(_BLOCK_SIZE)
+                if profile is not None:
+                    profile.load.stage_seconds["read"] += time.perf_counter() - started
+                    profile.load.bytes_read += len(block)
+                if not block:
+                    break
+                block = pending + block
+                end = block.rfind(b"\n") + 1
+                if end and self._tail is not None:
+                    block = self._skip_read_tail(block)
+                    end = block.rfind(b"\n") + 1
+                if end:
+                    added += self._add_lines(block[:end])
+                pending = block[end:]
+                started = time.perf_counter()
+        if pending and not complete_only:
+            tail_start = self.offset
+            tail_added = self._add_lines(pending)
+            self.offset = tail_start
+            if tail_added:
+                added += tail_added
+                self._tail = pending
+        return added
+    
+    def _skip_read_tail(self, block):
+        """
+        Jäta vahele varem reavahetuseta loetud rida, mis on nüüd reavahetusega lõpetatud.
+        
+        Args:
+            block (bytes): Baidinihkest self.offset algavad read, millest esimene on lõpetatud
+            
+        Returns:
+            bytes: Read pärast vahele jäetud rida
+            
+        Raises:
+            ValueError: Kui rida on pärast lugemist pikemaks kirjutatud
+        """
+        end = block.index(b"\n") + 1
+        tail, self._tail = self._tail, None
+        self.offset += end
+        if block[:end].rstrip(b"\r\n") != tail.rstrip(b"\r\n"):
+            raise ValueError(f"Faili {self.filename} viimane rida lõpetati pärast selle lugemist teisiti: "
+                             f"{tail!r}; loo statistika uuesti")
+        return block[end:]
+    
+    def _finish_load_profile(self, started):
+        """
+        Uuenda laadimise koguaega ja objektide arvu ning teavita tagasikutset.
+        
+        Args:
+            started (float): Laadimise algusaeg time.perf_counter() järgi
+        """
+        load = self.profile.load
+        load.elapsed += time.perf_counter() - started
+        load.peak_players = max(load.peak_players, len(self.players))
+        load.peak_games = max(load.peak_games, len(self.games))
+        self.profile.emit("load", load)
+    
+    def _add_lines(self, data):
+        """
+        Lisa baitidena antud read statistikasse.
+        
+        self.offset liigub edasi lisatud ridade võrra. Vigase rea korral jääb see
+        vigase rea algusesse, nii et juba lisatud ridu uuesti ei loeta.
+        
+        Args:
+            data (bytes): UTF-8 kodeeringus read
+            
+        Returns:
+            int: Lisatud mängukordade arv
+        """
+        if self.profile is not None:
+            return self._add_lines_profiled(data)
+        
+        text = data.decode("utf-8")
+        added = 0
+        # newline="" tunneb ära samad reavahetused, kuid jätab need alles, nii et ridade baidipikkus säilib
+        for line in io.StringIO(text, newline=""):
+            try:
+                play = parse_play(line)
+            except (ValueError, IndexError):
+                if not self.skip_malformed:
+                    self.offset += _lines_size(text, added)
+                    raise
+                continue
+            self._add_play(play)
+            added += 1
+        self.offset += len(data)
+        return added
+    
+    def _add_lines_profiled(self, data):
+        """
+        Lisa baitidena antud read statistikasse, mõõtes iga etapi aega.
+        
+        Args:
+            data (bytes): UTF-8 kodeeringus read
+            
+        Returns:
+            int: Lisatud mängukordade arv
+        """
+        load = self.profile.load
+        stages = load.stage_seconds
+        clock = time.perf_counter
+        
+        started = clock()
+        text = data.decode("utf-8")
+        stages["decode"] += clock() - started
+        
+        added = 0
+        for line in io.StringIO(text, newline=""):
+            started = clock()
+            try:
+                play = parse_play(line)
+            except (ValueError, IndexError):
+                load.malformed_lines += 1
+                if not self.skip_malformed:
+                    load.lines += added
+                    self.offset += _lines_size(text, added)
+                    raise
+                continue
+            parsed = clock()
+            self._add_play_to_game(play)
+            game_done = clock()
+            self._add_play_to_players(play)
+            stages["split"] += parsed - started
+            stages["game"] += game_done - parsed
+            stages["players"] += clock() - game_done
+            added += 1
+        load.lines += added
+        self.offset += len(data)
+        return added
+    
+    def _load_parallel(self, filename, workers):
+        """
+        Loe fail ridade piiridel tükkideks jagatuna mitmes protsessis ja liida osatulemused.
+        
+        Osad liidetakse faili järjekorras, nii et mängijate ja mängude esmakordse
+        ilmumise järjekord ning seega ka võrdsete tulemuste valik on sama mis ühes protsessis.
+        Reavahetuseta viimane rida loetakse pärast osade liitmist selles protsessis.
+        
+        Args:
+            filename (str): Mänguandmeid sisaldava faili asukoht
+            workers (int): Protsesside arv
+        """
+        options = {
+            "head_to_head": self.head_to_head is not None,
+            "skip_malformed": self.skip_malformed,
+            "profile": self.profile is not None,
+        }
+        boundaries = _chunk_boundaries(filename, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = executor.map(_load_chunk, itertools.repeat(filename), boundaries, boundaries[1:],
+                                    itertools.repeat(options))
+            for partial in partials:
+                self._merge(partial)
+        
+        self.offset = boundaries[-1]
+        self._read_new_lines(complete_only=False)
+    
+    def _merge(self, other):
+        """
+        Lisa teise statistika objekti andmed selle omale.
+        
+        Args:
+            other (Statistics): Hilisemate mängukordade osaline statistika
+        """
+        self.total_games += other.total_games
+        self._version += 1
+        if self.head_to_head is not None:
+            self.head_to_head.merge(other.head_to_head)
+        if self.profile is not None and other.profile is not None:
+            self.profile.load.merge(other.profile.load)
+        for result_type, count in other.result_type_counts.items():
+            self.result_type_counts[result_type] += count
+        for name, game in other.games.items():
+            if name in self.games:
+                self.games[name].merge(game)
+            else:
+                self.games[name] = game
+        for name, player in other.players.items():
+            if name in self.players:
+                self.players[name].merge(player)
+            else:
+                self.players[name] = player
+    
+    def _add_play(self, play):
+        """
+        Lisa parsitud mängukord mängu ja kõigi osalenud mängijate statistikasse.
+        
+        Args:
+            play (Play): Parsitud mängukord
+        """
+        self._add_play_to_game(play)
+        self._add_play_to_players(play)
+    
+    def _add_play_to_game(self, play):
+        """
+        Lisa parsitud mängukord koondloenduritesse ja mängu statistikasse.
+        
+        Kompaktses režiimis uuendatakse siin ka mängijate loendurid.
+        
+        Args:
+            play (Play): Parsitud mängukord
+        """
+        self.total_games += 1
+        self._version += 1
+        self.result_type_counts[play.result_type] += 1
+        
+        if self.head_to_head is not None:
+            self.head_to_head.add_play(play)
+        
+        if self._store is not None:
+            self._store.add_play(play)
+            return
+        
+        game = self.games.get(play.game_name)
+        if game is None:
+            game = self.games[play.game_name] = Game(play.game_name)
+        game.add_parsed_play(play)
+    
+    def _add_play_to_players(self, play):
+        """
+        Lisa parsitud mängukord kõigi osalenud mängijate statistikasse.
+        
+        Args:
+            play (Play): Parsitud mängukord
+        """
+        if self._store is not None:
+            return
+        
+        # Mängija kaotab ainult siis, kui tema nimi on viimane tulemus
+        loser = play.results[-1] if play.result_type in ("points", "places") else None
+        for player in play.players:
+            if player not in self.players:
+                self.players[player] = Player(player)
+            self.players[player].add_game(play.game_name, player in play.winners, player == loser)
+    
+    def player_rows(self):
+        """
+        Koosta kõigi mängijate statistika ridadena ühe läbimisega.
+        
+        Veerud on PLAYER_COLUMNS järjekorras. Rekordtulemus on mängija parim
+        punktisumma kõigis mängudes või None, kui tal punktitulemusi pole.
+        
+        Yields:
+            tuple: Ühe mängija rida
+        """
+        if self._store is not None:
+            yield from self._store.player_rows()
+            return
+        
+        record_scores = {}
+        for game in self.games.values():
+            for player, score in game.high_scores.items():
+                if player not in record_scores or record_scores[player] < score:
+                    record_scores[player] = score
+        
+        for name, player in self.players.items():
+            plays = sum(player.games_played.values())
+            yield (name, plays, player.wins, player.losses, player.wins / plays if plays else 0.0,
+                   player.favourite_game(), record_scores.get(name))
+    
+    def game_rows(self):
+        """
+        Koosta kõigi mängude statistika ridadena ühe läbimisega.
+        
+        Veerud on GAME_COLUMNS järjekorras.
+        
+        Yields:
+            tuple: Ühe mängu rida
+        """
+        for name, game in self.games.items():
+            record_holder = game.record_holder()
+            yield (name, game.play_count, self._GAME_INFO["player-amount"](game), game.most_wins(),
+                   game.most_frequent_winner(), game.most_losses(), game.most_frequent_loser(), record_holder,
+                   game.high_scores[record_holder] if record_holder is not None else None)
+    
+    def player_table(self, use_numpy=None):
+        """
+        Koosta kõigi mängijate statistika veergudena.
+        
+        Args:
+            use_numpy (bool): Kas anda veerud NumPy massiividena (vaikimisi, kui NumPy on olemas)
+            
+        Returns:
+            dict: Veeru nimi PLAYER_COLUMNS seast -> veeru väärtused
+        """
+        return _columns(PLAYER_COLUMNS, self.player_rows(), use_numpy)
+    
+    def game_table(self, use_numpy=None):
+        """
+        Koosta kõigi mängude statistika veergudena.
+        
+        Args:
+            use_numpy (bool): Kas anda veerud NumPy massiividena (vaikimisi, kui NumPy on olemas)
+            
+        Returns:
+            dict: Veeru nimi GAME_COLUMNS seast -> veeru väärtused
+        """
+        return _columns(GAME_COLUMNS, self.game_rows(), use_numpy)
+    
+    def write_players_csv(self, file):
+        """
+        Kirjuta kõigi mängijate statistika CSV-na, rida korraga.
+        
+        Args:
+            file: Tekstifail või muu objekt, millel on write()
+        """
+        writer = csv.writer(file)
+        writer.writerow(PLAYER_COLUMNS)
+        writer.writerows(self.player_rows())
+    
+    def write_games_csv(self, file):
+        """
+        Kirjuta kõigi mängude statistika CSV-na, rida korraga.
+        
+        Args:
+            file: Tekstifail või muu objekt, millel on write()
+        """
+        writer = csv.writer(file)
+        writer.writerow(GAME_COLUMNS)
+        writer.writerows(self.game_rows())
+    
+    def _get_player_info(self, player_name, info_type):
+        """
+        Abimeetod mängijapõhise teabe saamiseks.
+        
+        Args:
+            player_name (str): Mängija nimi
+            info_type (str): Soovitud teabe tüüp
+            
+        Returns:
+            Mitmesugused: Soovitud mängija teave või None, kui ei leitud
+        """
+        player = self.players.get(player_name)
+        if not player:
+            return None
+        
+        info = self._PLAYER_INFO.get(info_type)
+        return info(player) if info else player
+    
+    def _get_game_info(self, game_name, info_type):
+        """
+        Abimeetod mängupõhise teabe saamiseks.
+        
+        Args:
+            game_name (str): Mängu nimi
+            info_type (str): Soovitud teabe tüüp
+            
+        Returns:
+            Mitmesugused: Soovitud mängu teave või None, kui ei leitud
+        """
+        game = self.games.get(game_name)
+        if not game:
+            return None
+        
+        info = self._GAME_INFO.get(info_type)
+        return info(game) if info else game
+    
+    def _get_head_to_head(self, player_name, opponent_name, game_name=None):
+        """
+        Abimeetod kahe mängija omavaheliste tulemuste saamiseks.
+        
+        Args:
+            player_name (str): Mängija nimi
+            opponent_name (str): Vastase nimi
+            game_name (str): Mängu nimi; kui puudub, antakse kõigi mängude kokkuvõte
+            
+        Returns:
+            dict või None: Kohtumiste, võitude ja kaotuste arv või None, kui indeksit
+            pole või mängijat ei leitud
+        """
+        if self.head_to_head is None or player_name not in self.players or opponent_name not in self.players:
+            return None
+        return self.head_to_head.get(player_name, opponent_name, game_name)
+    
+    def _get_game_top(self, game_name, top_type, k):
+        """
+        Abimeetod mängu edetabeli esimeste mängijate saamiseks.
+        
+        Args:
+            game_name (str): Mängu nimi
+            top_type (str): Edetabeli tüüp, näiteks "top-winners"
+            k (str): Soovitud mängijate arv
+            
+        Returns:
+            list või None: Mängijate nimed või None, kui mängu pole või k pole arv
+        """
+        game = self.games.get(game_name)
+        if not game or not k.isdecimal():
+            return None
+        return self._GAME_TOP[top_type](game, int(k))
+    
+    def get(self, path):
+        """
+        Hangi statistika vastavalt määratud teele.
+        
+        Tulemused puhverdatakse normaliseeritud tee järgi. Puhver tühjendatakse,
+        kui pärast eelmist päringut on lisandunud mängukordi.
+        
+        Args:
+            path (str): Tee, mis määrab hangitava statistika
+            
+        Returns:
+            Mitmesugused: Soovitud statistika või None, kui ei leitud
+        """
+        key = path.strip("/")
+        if self.profile is None:
+            return self._lookup(key)[0]
+        
+        started = time.perf_counter()
+        result, hit = self._lookup(key)
+        seconds = time.perf_counter() - started
+        parts = key.split("/")
+        route = f"{parts[0]}/*/{parts[2]}" if len(parts) > 2 else parts[0]
+        self.profile.queries.record(route, hit, seconds)
+        self.profile.emit("query", (route, hit, seconds))
+        return result
+    
+    def _lookup(self, key):
+        """
+        Leia normaliseeritud teele vastav statistika puhvrist või arvuta see.
+        
+        Args:
+            key (str): Tee ilma alguse ja lõpu kaldkriipsudeta
+            
+        Returns:
+            tuple: Statistika (loendid ja sõnastikud koopiana) ja kas see tuli puhvrist
+        """
+        cache = self._cache
+        if self._cache_version != self._version:
+            cache.clear()
+            self._cache_version = self._version
+        
+        hit = key in cache
+        if hit:
+            cache.move_to_end(key)
+            result = cache[key]
+        else:
+            result = self._route(key)
+            cache[key] = result
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        
+        # Loendeid ja sõnastikke võib kutsuja muuta, seega antakse välja koopia
+        if isinstance(result, (list, dict)):
+            return type(result)(result), hit
+        return result, hit
+    
+    def _route(self, key):
+        """
+        Leia normaliseeritud teele vastav statistika ilma puhvrita.
+        
+        Args:
+            key (str): Tee ilma alguse ja lõpu kaldkriipsudeta
+            
+        Returns:
+            Mitmesugused: Soovitud statistika või None, kui ei leitud
+        """
+        parts = key.split("/")
+        route = self._ROUTES.get(parts[0])
+        return route(self, parts) if route else None
+    
+    def _route_players(self, parts):
+        """Hangi mängijate nimekiri."""
+        return list(self.players.keys())
+    
+    def _route_games(self, parts):
+        """Hangi mängude nimekiri."""
+        return list(self.games.keys())
+    
+    def _route_total(self, parts):
+        """Hangi mängude koguarv või tulemustüüpide loendus."""
+        if len(parts) == 1:
+            return self.total_games
+        return self.result_type_counts.get(parts[1], 0)
+    
+    def _route_player(self, parts):
+        """Hangi mängija teave."""
+        if len(parts) == 1:
+            return None
+        if len(parts) == 2:
+            return self.players.get(parts[1])
+        if len(parts) > 3 and parts[2] == "vs":
+            return self._get_head_to_head(parts[1], parts[3], parts[4] if len(parts) > 4 else None)
+        return self._get_player_info(parts[1], parts[2])
+    
+    def _route_game(self, parts):
+        """Hangi mängu teave."""
+        if len(parts) == 1:
+            return None
+        if len(parts) == 2:
+            return self.games.get(parts[1])
+        if len(parts) > 3 and parts[2] in self._GAME_TOP:
+            return self._get_game_top(parts[1], parts[2], parts[3])
+        return self._get_game_info(parts[1], parts[2])
+    
+    _ROUTES = {
+        "players": _route_players,
+        "games": _route_games,
+        "total": _route_total,
+        "player": _route_player,
+        "game": _route_game,
+    }
@@ -1,9 +1,18 @@
 """Order."""
+import bisect
+import collections
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 
 class OrderItem:
     """Order Item requested by a customer."""
 
+    __slots__ = ("customer", "name", "quantity", "one_item_volume")
+
     def __init__(self, customer: str, name: str, quantity: int, one_item_volume: int):
         """
         Order item constructor.
@@ -29,7 +38,12 @@ class OrderItem:
 
 
 class Order:
-    """Combination of order items of one customer."""
+    """
+    Combination of order items of one customer.
+
+    Total quantity and volume are kept as running totals, so change the items
+    through add_item and remove_item rather than editing order_items directly.
+    """
 
     def __init__(self, order_items: list):
         """
@@ -39,47 +53,80 @@ class Order:
         """
         self.order_items = order_items
         self.destination = None
+        self._total_quantity = sum(item.quantity for item in order_items)
+        self._total_volume = sum(item.total_volume for item in order_items)
 
     @property
     def total_quantity(self) -> int:
         """
-        Calculate and return the sum of quantities of all items in the order.
+        Return the sum of quantities of all items in the order.
 
         :return: Total quantity as int.
         """
-        return sum(item.quantity for item in self.order_items)
+        return self._total_quantity
 
     @property
     def total_volume(self) -> int:
         """
-        Calculate and return the total volume of all items in the order.
+        Return the total volume of all items in the order.
 
         :return: Total volume (cm^3) as int.
         """
-        return sum(item.total_volume for item in self.order_items)
+        return self._total_volume
+
+    def add_item(self, item: OrderItem):
+        """
+        Add an order item to the order.
+
+        :param item: Item to add.
+        :return: None
+        """
+        self.order_items.append(item)
+        self._total_quantity += item.quantity
+        self._total_volume += item.total_volume
+
+    def remove_item(self, item: OrderItem):
+        """
+        Remove an order item from the order.
+
+        :param item: Item to remove.
+        :return: None
+        """
+        self.order_items.remove(item)
+        self._total_quantity -= item.quantity
+        self._total_volume -= item.total_volume
 
 
 class Container:
-    """Container to transport orders."""
+    """
+    Container to transport orders.
 
-    def __init__(self, volume: int, orders=None):
+    Used volume is kept as a running total, so change the orders through
+    add_order and remove_order rather than editing orders directly.
+    """
+
+    def __init__(self, volume: int, orders=None, used_volume: int = None):
         """
         Initialize a container.
 
         :param volume: The total volume of the container.
         :param orders: List of orders initially placed in the container (default is empty).
+        :param used_volume: Total volume of orders when already known (default is calculated from orders).
         """
         self.volume = volume
         self.orders = orders if orders is not None else []
+        if used_volume is None:
+            used_volume = sum(order.total_volume for order in self.orders)
+        self._used_volume = used_volume
 
     @property
     def volume_left(self) -> int:
         """
-        Calculate and return the remaining volume in the container.
+        Return the remaining volume in the container.
 
         :return: Remaining volume as int.
         """
-        return self.volume - sum(order.total_volume for order in self.orders)
+        return self.volume - self._used_volume
 
     def add_order(self, order: Order) -> bool:
         """
@@ -90,9 +137,281 @@ class Container:
         """
         if order.total_volume <= self.volume_left:
             self.orders.append(order)
+            self._used_volume += order.total_volume
             return True
         return False
 
+    def remove_order(self, order: Order, volume: int = None):
+        """
+        Remove an order from the container.
+
+        :param order: Order to be removed.
+        :param volume: Volume the order had when it was added (default is its current total volume).
+        :return: None
+        """
+        self.orders.remove(order)
+        self._used_volume -= order.total_volume if volume is None else volume
+
+
+class FirstFitIndex:
+    """
+    Free-space index of one destination's containers for first-fit placement.
+
+    Free volumes of the containers are kept in a max segment tree, so the first
+    container an order fits into is found and updated in O(log m).
+    """
+
+    def __init__(self, container_volume: int):
+        """
+        Initialize an empty index.
+
+        :param container_volume: Volume of every container opened by the index.
+        """
+        self.container_volume = container_volume
+        self.free = []
+        self._capacity = 1
+        self._tree = [-1, -1]
+
+    def place(self, volume: int) -> int:
+        """
+        Reserve volume in the first container it fits into, opening a new container if needed.
+
+        :param volume: Volume to reserve.
+        :return: Index of the container.
+        """
+        tree = self._tree
+        if tree[1] < volume:
+            index = self._open()
+        else:
+            capacity = self._capacity
+            node = 1
+            while node < capacity:
+                node *= 2
+                if tree[node] < volume:
+                    node += 1
+            index = node - capacity
+        self._set(index, self.free[index] - volume)
+        return index
+
+    def release(self, index: int, volume: int):
+        """
+        Give volume back to a container.
+
+        :param index: Index of the container.
+        :param volume: Volume to release.
+        :return: None
+        """
+        self._set(index, self.free[index] + volume)
+
+    def _open(self) -> int:
+        index = len(self.free)
+        self.free.append(self.container_volume)
+        if index >= self._capacity:
+            self._grow()
+        self._set(index, self.container_volume)
+        return index
+
+    def _grow(self):
+        self._capacity *= 2
+        tree = [-1] * (2 * self._capacity)
+        tree[self._capacity:self._capacity + len(self.free)] = self.free
+        for node in range(self._capacity - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._tree = tree
+
+    def _set(self, index: int, value: int):
+        self.free[index] = value
+        tree = self._tree
+        node = index + self._capacity
+        tree[node] = value
+        node //= 2
+        while node:
+            left = tree[2 * node]
+            right = tree[2 * node + 1]
+            largest = left if left > right else right
+            if tree[node] == largest:
+                # the ancestors already hold this maximum
+                break
+            tree[node] = largest
+            node //= 2
+
+
+class BestFitIndex:
+    """
+    Free-space index of one destination's containers for best-fit placement.
+
+    (free volume, container index) pairs are kept sorted in a list, so the
+    tightest container is found by bisection in O(log m). Moving a container
+    to its new position in the list is O(m), though it is a single memmove
+    and stays cheap next to the O(m) scan a plain best-fit needs.
+    """
+
+    def __init__(self, container_volume: int):
+        """
+        Initialize an empty index.
+
+        :param container_volume: Volume of every container opened by the index.
+        """
+        self.container_volume = container_volume
+        self.free = []
+        self._sorted = []
+
+    def place(self, volume: int) -> int:
+        """
+        Reserve volume in the container with the least free space it fits into.
+
+        :param volume: Volume to reserve.
+        :return: Index of the container.
+        """
+        position = bisect.bisect_left(self._sorted, (volume, -1))
+        if position == len(self._sorted):
+            index = len(self.free)
+            self.free.append(self.container_volume)
+        else:
+            index = self._sorted.pop(position)[1]
+        self.free[index] -= volume
+        bisect.insort(self._sorted, (self.free[index], index))
+        return index
+
+    def release(self, index: int, volume: int):
+        """
+        Give volume back to a container.
+
+        :param index: Index of the container.
+        :param volume: Volume to release.
+        :return: None
+        """
+        del self._sorted[bisect.bisect_left(self._sorted, (self.free[index], index))]
+        self.free[index] += volume
+        bisect.insort(self._sorted, (self.free[index], index))
+
+
+class PackingEngine:
+    """Bin-packing engine that places orders of one destination into containers."""
+
+    STRATEGIES = {
+        "first-fit": (FirstFitIndex, False),
+        "best-fit": (BestFitIndex, False),
+        "first-fit-decreasing": (FirstFitIndex, True),
+    }
+
+    def __init__(self, container_volume: int, strategy: str = "first-fit"):
+        """
+        Initialize packing engine.
+
+        :param container_volume: Volume of each container.
+        :param strategy: One of STRATEGIES.
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown packing strategy: {strategy}")
+        self.container_volume = container_volume
+        self.strategy = strategy
+
+    def new_index(self):
+        """
+        Create an empty free-space index for the strategy.
+
+        :return: FirstFitIndex or BestFitIndex.
+        """
+        index_class, _ = self.STRATEGIES[self.strategy]
+        return index_class(self.container_volume)
+
+    def pack_volumes(self, volumes: list) -> list:
+        """
+        Place volumes into containers.
+
+        Every volume must fit into an empty container.
+
+        :param volumes: list of volumes.
+        :return: list of containers, each a list of positions in volumes.
+        """
+        index_class, decreasing = self.STRATEGIES[self.strategy]
+        if decreasing and index_class is FirstFitIndex:
+            return self._pack_first_fit_decreasing(volumes)
+        free_space = self.new_index()
+        positions = range(len(volumes))
+        if decreasing:
+            positions = sorted(positions, key=lambda position: -volumes[position])
+
+        bins = []
+        for position in positions:
+            index = free_space.place(volumes[position])
+            if index == len(bins):
+                bins.append([])
+            bins[index].append(position)
+        return bins
+
+    def _pack_first_fit_decreasing(self, volumes: list) -> list:
+        """
+        Place volumes first-fit-decreasing, filling one container at a time.
+
+        A container ends up with the same volumes whether the sorted volumes are
+        placed first-fit one by one or the container takes the largest remaining
+        volume that still fits until none does. The latter finds that volume by
+        bisecting the distinct volumes, skipping used up ones through a
+        path-compressed pointer to the next smaller volume left.
+
+        :param volumes: list of volumes.
+        :return: list of containers, each a list of positions in volumes.
+        """
+        positions_by_volume = {}
+        for position, volume in enumerate(volumes):
+            positions_by_volume.setdefault(volume, []).append(position)
+        sizes = sorted(positions_by_volume)
+        # positions of every size reversed, so pop() takes them in their original order
+        stacks = [positions_by_volume[size][::-1] for size in sizes]
+        smaller_left = list(range(len(sizes)))
+
+        def find(size_index: int) -> int:
+            root = size_index
+            while root >= 0 and smaller_left[root] != root:
+                root = smaller_left[root]
+            while size_index != root:
+                smaller_left[size_index], size_index = root, smaller_left[size_index]
+            return root
+
+        bins = []
+        largest = find(len(sizes) - 1)
+        while largest >= 0:
+            size_index = largest
+            left = self.container_volume
+            positions = []
+            while size_index >= 0:
+                stack = stacks[size_index]
+                positions.append(stack.pop())
+                left -= sizes[size_index]
+                if not stack:
+                    smaller_left[size_index] = size_index - 1
+                size_index = find(bisect.bisect_right(sizes, left, 0, size_index + 1) - 1)
+            bins.append(positions)
+            largest = find(largest)
+        return bins
+
+    def pack(self, orders: list) -> list:
+        """
+        Put orders into containers.
+
+        :param orders: list of orders that fit into an empty container.
+        :return: list of containers.
+        """
+        return self.build_containers(orders, self.pack_volumes([order.total_volume for order in orders]))
+
+    def build_containers(self, orders: list, bins: list, volumes: list = None) -> list:
+        """
+        Create containers from the result of pack_volumes.
+
+        :param orders: list of orders that were packed.
+        :param bins: list of containers, each a list of positions in orders.
+        :param volumes: Volumes of the orders that were packed, to avoid summing them again.
+        :return: list of containers.
+        """
+        if volumes is None:
+            return [Container(self.container_volume, [orders[position] for position in positions])
+                    for positions in bins]
+        return [Container(self.container_volume, [orders[position] for position in positions],
+                          sum(volumes[position] for position in positions))
+                for positions in bins]
+
 
 class OrderAggregator:
     """Algorithm of aggregating orders."""
@@ -110,6 +429,15 @@ class OrderAggregator:
         """
         self.order_items.append(item)
 
+    def add_items(self, items):
+        """
+        Add many order items to the aggregator.
+
+        :param items: Iterable of items to add.
+        :return: None
+        """
+        self.order_items.extend(items)
+
     def aggregate_order(self, customer: str, max_items_quantity: int, max_volume: int) -> Order:
         """
         Create an order for customer which contains order lines added by add_item method.
@@ -134,18 +462,315 @@ class OrderAggregator:
 
         return Order(order_items)
 
+    def aggregate_all(self, limits: dict = None, default_limits: tuple = None) -> dict:
+        """
+        Create orders for all customers in one pass over the added order lines.
+
+        Every customer is aggregated with the same greedy rules as aggregate_order.
+        Items that did not fit stay in the aggregator in their original order.
+
+        :param limits: dict of customer -> (max_items_quantity, max_volume).
+        :param default_limits: (max_items_quantity, max_volume) for customers missing from limits.
+            Customers without any limits are left untouched.
+        :return: dict of customer -> Order.
+        """
+        limits = limits or {}
+        aggregated = {}
+        skipped = set()
+        remaining = []
+
+        for item in self.order_items:
+            customer = item.customer
+            state = aggregated.get(customer)
+            if state is None:
+                customer_limits = None if customer in skipped else limits.get(customer, default_limits)
+                if customer_limits is None:
+                    skipped.add(customer)
+                    remaining.append(item)
+                    continue
+                state = aggregated[customer] = [[], 0, 0, *customer_limits]
+
+            order_items, total_quantity, total_volume, max_items_quantity, max_volume = state
+            if total_quantity + item.quantity > max_items_quantity or total_volume + item.total_volume > max_volume:
+                remaining.append(item)
+                continue
+            order_items.append(item)
+            state[1] = total_quantity + item.quantity
+            state[2] = total_volume + item.total_volume
+
+        self.order_items = remaining
+        return {customer: Order(state[0]) for customer, state in aggregated.items()}
+
+
+class IndexedOrderAggregator(OrderAggregator):
+    """
+    Order aggregator that keeps pending items bucketed per customer.
+
+    Every item gets an increasing key, so both the global and the per-customer
+    buckets are insertion-ordered dicts and an accepted item is removed in O(1).
+    aggregate_order only walks the items of the requested customer.
+    """
+
+    def __init__(self):
+        """Initialize indexed order aggregator."""
+        self._items = {}
+        self._items_by_customer = {}
+        self._next_key = 0
+
+    @property
+    def order_items(self) -> list:
+        """
+        Return pending order items in the order they were added.
+
+        :return: list of order items.
+        """
+        return list(self._items.values())
+
+    def add_item(self, item: OrderItem):
+        """
+        Add order item to the aggregator.
+
+        :param item: Item to add.
+        :return: None
+        """
+        key = self._next_key
+        self._next_key += 1
+        self._items[key] = item
+        self._items_by_customer.setdefault(item.customer, {})[key] = item
+
+    def add_items(self, items):
+        """
+        Add many order items to the aggregator.
+
+        :param items: Iterable of items to add.
+        :return: None
+        """
+        for item in items:
+            self.add_item(item)
+
+    def aggregate_order(self, customer: str, max_items_quantity: int, max_volume: int) -> Order:
+        """
+        Create an order for customer which contains order lines added by add_item method.
+
+        :param customer: Customer's name to create an order for.
+        :param max_items_quantity: Maximum amount on items in order.
+        :param max_volume: Maximum volume of order.
+        :return: Order.
+        """
+        bucket = self._items_by_customer.get(customer)
+        if not bucket:
+            return Order([])
+        return self._aggregate_bucket(customer, bucket, max_items_quantity, max_volume)
+
+    def aggregate_all(self, limits: dict = None, default_limits: tuple = None) -> dict:
+        """
+        Create orders for all customers in one pass over the added order lines.
+
+        Every customer is aggregated with the same greedy rules as aggregate_order.
+        Items that did not fit stay in the aggregator in their original order.
+
+        :param limits: dict of customer -> (max_items_quantity, max_volume).
+        :param default_limits: (max_items_quantity, max_volume) for customers missing from limits.
+            Customers without any limits are left untouched.
+        :return: dict of customer -> Order.
+        """
+        limits = limits or {}
+        orders = {}
+        buckets = sorted(self._items_by_customer.items(), key=lambda customer_bucket: next(iter(customer_bucket[1])))
+
+        for customer, bucket in buckets:
+            customer_limits = limits.get(customer, default_limits)
+            if customer_limits is not None:
+                orders[customer] = self._aggregate_bucket(customer, bucket, *customer_limits)
+
+        return orders
+
+    def _aggregate_bucket(self, customer: str, bucket: dict, max_items_quantity: int, max_volume: int) -> Order:
+        """
+        Greedily move items of one customer's bucket into an order.
+
+        :param customer: Customer the bucket belongs to.
+        :param bucket: dict of key -> pending item of the customer.
+        :param max_items_quantity: Maximum amount on items in order.
+        :param max_volume: Maximum volume of order.
+        :return: Order.
+        """
+        order_items = []
+        total_quantity = 0
+        total_volume = 0
+
+        for key, item in list(bucket.items()):
+            if total_quantity + item.quantity > max_items_quantity or total_volume + item.total_volume > max_volume:
+                continue
+            order_items.append(item)
+            total_quantity += item.quantity
+            total_volume += item.total_volume
+            del bucket[key]
+            del self._items[key]
+
+        if not bucket:
+            del self._items_by_customer[customer]
+
+        return Order(order_items)
+
+
+class ConcurrentOrderAggregator(OrderAggregator):
+    """
+    Order aggregator that many threads can add items to while others aggregate.
+
+    Producers only append to one shared deque, which is atomic and takes no lock,
+    so producers never wait for each other or for aggregation, and the deque
+    order is the global insertion order. Aggregation takes the aggregator's lock,
+    moves newly added items into per-customer deques and then works on the
+    requested customer's deque only, so it never scans other customers' items.
+
+    Under the GIL producers still run one at a time: adding does not get faster
+    with more threads, it only stops waiting. What scales is aggregation, whose
+    cost no longer grows with the items of other customers (see order_stress.py).
+    """
+
+    def __init__(self):
+        """Initialize concurrent order aggregator."""
+        self._incoming = collections.deque()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    @property
+    def order_items(self) -> list:
+        """
+        Return a snapshot of pending order items in the order they were added.
+
+        :return: list of order items.
+        """
+        with self._lock:
+            self._drain()
+            snapshots = [entries.copy() for entries in self._buckets.values()]
+        return [item for _, item in heapq.merge(*snapshots, key=lambda entry: entry[0])]
+
+    def add_item(self, item: OrderItem):
+        """
+        Add order item to the aggregator.
+
+        :param item: Item to add.
+        :return: None
+        """
+        self._incoming.append(item)
+
+    def add_items(self, items):
+        """
+        Add many order items to the aggregator.
+
+        :param items: Iterable of items to add.
+        :return: None
+        """
+        self._incoming.extend(items)
+
+    def aggregate_order(self, customer: str, max_items_quantity: int, max_volume: int) -> Order:
+        """
+        Create an order for customer which contains order lines added by add_item method.
+
+        :param customer: Customer's name to create an order for.
+        :param max_items_quantity: Maximum amount on items in order.
+        :param max_volume: Maximum volume of order.
+        :return: Order.
+        """
+        with self._lock:
+            self._drain()
+            entries = self._buckets.get(customer)
+            if entries is None:
+                return Order([])
+            return self._aggregate_entries(entries, max_items_quantity, max_volume)
+
+    def aggregate_all(self, limits: dict = None, default_limits: tuple = None) -> dict:
+        """
+        Create orders for all customers.
+
+        Every customer is aggregated with the same greedy rules as aggregate_order.
+        Items that did not fit stay in the aggregator in their original order.
+
+        :param limits: dict of customer -> (max_items_quantity, max_volume).
+        :param default_limits: (max_items_quantity, max_volume) for customers missing from limits.
+            Customers without any limits are left untouched.
+        :return: dict of customer -> Order.
+        """
+        limits = limits or {}
+        orders = {}
+        with self._lock:
+            self._drain()
+            first_pending = sorted((entries[0][0], customer) for customer, entries in self._buckets.items() if entries)
+            for _, customer in first_pending:
+                customer_limits = limits.get(customer, default_limits)
+                if customer_limits is not None:
+                    orders[customer] = self._aggregate_entries(self._buckets[customer], *customer_limits)
+        return orders
+
+    def _drain(self):
+        """
+        Move items added since the last call into the per-customer deques, stamped in insertion order.
+
+        Must be called with the aggregator's lock held.
+
+        :return: None
+        """
+        incoming = self._incoming
+        buckets = self._buckets
+        sequence = self._sequence
+        while incoming:
+            item = incoming.popleft()
+            entries = buckets.get(item.customer)
+            if entries is None:
+                entries = buckets[item.customer] = collections.deque()
+            entries.append((sequence, item))
+            sequence += 1
+        self._sequence = sequence
+
+    @staticmethod
+    def _aggregate_entries(entries: collections.deque, max_items_quantity: int, max_volume: int) -> Order:
+        """
+        Greedily move items of one customer's deque into an order.
+
+        Must be called with the aggregator's lock held.
+
+        :param entries: deque of (sequence number, item) of one customer.
+        :param max_items_quantity: Maximum amount on items in order.
+        :param max_volume: Maximum volume of order.
+        :return: Order.
+        """
+        order_items = []
+        total_quantity = 0
+        total_volume = 0
+
+        remaining = []
+        for _ in range(len(entries)):
+            entry = entries.popleft()
+            item = entry[1]
+            if total_quantity + item.quantity > max_items_quantity or total_volume + item.total_volume > max_volume:
+                remaining.append(entry)
+                continue
+            order_items.append(item)
+            total_quantity += item.quantity
+            total_volume += item.total_volume
+        entries.extendleft(reversed(remaining))
+
+        return Order(order_items)
+
 
 class ContainerAggregator:
     """Algorithm to prepare containers."""
 
-    def __init__(self, container_volume: int):
+    def __init__(self, container_volume: int, strategy: str = "first-fit", workers: int = None):
         """
         Initialize Container Aggregator.
 
         :param container_volume: Volume of each container created by this aggregator.
+        :param strategy: Packing strategy, one of PackingEngine.STRATEGIES.
+        :param workers: Number of worker processes to pack destinations in parallel with (default is serial).
         """
         self.container_volume = container_volume
         self.not_used_orders = []
+        self.engine = PackingEngine(container_volume, strategy)
+        self.workers = workers
 
     def prepare_containers(self, orders: tuple) -> dict:
         """
@@ -154,29 +779,304 @@ class ContainerAggregator:
         :param orders: tuple of orders.
         :return: dict where keys are destinations and values are containers to that destination with orders.
         """
-        containers_by_destination = {}
+        orders_by_destination = {}
 
         for order in orders:
             if order.total_volume > self.container_volume:
                 self.not_used_orders.append(order)
                 continue
+            orders_by_destination.setdefault(order.destination, []).append(order)
 
-            if order.destination not in containers_by_destination:
-                containers_by_destination[order.destination] = []
+        if self.workers and self.workers > 1 and len(orders_by_destination) > 1:
+            return self._prepare_containers_parallel(orders_by_destination)
+
+        return {destination: self.engine.pack(destination_orders)
+                for destination, destination_orders in orders_by_destination.items()}
+
+    def _prepare_containers_parallel(self, orders_by_destination: dict) -> dict:
+        """
+        Pack every destination on a process pool.
+
+        Only order volumes are sent to the workers, the containers are built
+        from the original orders once the placements come back.
+
+        :param orders_by_destination: dict of destination -> list of orders.
+        :return: dict of destination -> list of containers.
+        """
+        volumes = [[order.total_volume for order in destination_orders]
+                   for destination_orders in orders_by_destination.values()]
+        chunksize = max(1, len(volumes) // (self.workers * 4))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            all_bins = list(executor.map(self.engine.pack_volumes, volumes, chunksize=chunksize))
+
+        return {destination: self.engine.build_containers(destination_orders, bins)
+                for (destination, destination_orders), bins in zip(orders_by_destination.items(), all_bins)}
 
-            added = False
-            for container in containers_by_destination[order.destination]:
-                if container.add_order(order):
-                    added = True
-                    break
 
-            if not added:
-                new_container = Container(self.container_volume)
-                new_container.add_order(order)
-                containers_by_destination[order.destination].append(new_container)
+class OptimizingContainerAggregator(ContainerAggregator):
+    """
+    Container aggregator that tries to ship fewer containers than greedy packing.
+
+    Every destination starts from a first-fit-decreasing plan. Until the time
+    budget runs out, a local search tries to empty the lightest containers by
+    moving their orders into the others, swapping a smaller order out when an
+    order does not fit anywhere. A plan is only replaced by one with fewer
+    containers, so no destination ever gets more containers than
+    ContainerAggregator with the first-fit-decreasing strategy gives it.
+
+    The first-fit-decreasing plans and their containers are built before the
+    search starts, the search of a destination stops early enough to rebuild
+    its containers before the deadline, and every loop of the search checks
+    the deadline. A budget shorter than grouping, packing and building the
+    greedy plans themselves cannot be met, the greedy plans are returned as
+    soon as they are built then.
+    """
+
+    def __init__(self, container_volume: int, time_budget: float):
+        """
+        Initialize Optimizing Container Aggregator.
+
+        :param container_volume: Volume of each container created by this aggregator.
+        :param time_budget: Wall-clock seconds one prepare_containers call may spend.
+        """
+        super().__init__(container_volume, "first-fit-decreasing")
+        self.time_budget = time_budget
+        self.lower_bounds = {}
+        self.bound_gaps = {}
+
+    def prepare_containers(self, orders: tuple) -> dict:
+        """
+        Create containers and put orders to them, using as few containers as found within the budget.
+
+        lower_bounds and bound_gaps are replaced with the lower bound of the container count of every
+        destination of these orders and how many containers the plan uses above it.
+
+        :param orders: tuple of orders.
+        :return: dict where keys are destinations and values are containers to that destination with orders.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        self.lower_bounds = {}
+        self.bound_gaps = {}
+        orders_by_destination = {}
+
+        for order in orders:
+            volume = order.total_volume
+            if volume > self.container_volume:
+                self.not_used_orders.append(order)
+                continue
+            destination_orders, volumes = orders_by_destination.setdefault(order.destination, ([], []))
+            destination_orders.append(order)
+            volumes.append(volume)
+
+        plans = {}
+        for destination, (destination_orders, volumes) in orders_by_destination.items():
+            plans[destination] = self.engine.pack_volumes(volumes)
+            self.lower_bounds[destination] = self._lower_bound(volumes)
+
+        build_started = time.perf_counter()
+        containers_by_destination = {
+            destination: self.engine.build_containers(destination_orders, plans[destination], volumes)
+            for destination, (destination_orders, volumes) in orders_by_destination.items()}
+        # Rebuilding a destination may take up to twice as long per order as the first build did.
+        rebuild_per_order = 2 * (time.perf_counter() - build_started) / max(1, len(orders))
+
+        for destination, (destination_orders, volumes) in orders_by_destination.items():
+            bins = plans[destination]
+            stop = deadline - rebuild_per_order * len(volumes)
+            if len(bins) > self.lower_bounds[destination] and time.perf_counter() < stop:
+                improved = self._improve(volumes, bins, self.lower_bounds[destination], stop)
+                if len(improved) < len(bins):
+                    bins = improved
+                    containers_by_destination[destination] = self.engine.build_containers(
+                        destination_orders, bins, volumes)
+            self.bound_gaps[destination] = len(bins) - self.lower_bounds[destination]
 
         return containers_by_destination
 
+    def _lower_bound(self, volumes: list) -> int:
+        """
+        Calculate a lower bound of the number of containers the volumes need.
+
+        :param volumes: list of volumes.
+        :return: The larger of the total volume bound and the number of volumes over half a container.
+        """
+        by_total_volume = -(-sum(volumes) // self.container_volume)
+        by_large_volumes = sum(1 for volume in volumes if 2 * volume > self.container_volume)
+        return max(by_total_volume, by_large_volumes)
+
+    def _improve(self, volumes: list, bins: list, lower_bound: int, deadline: float) -> list:
+        """
+        Remove containers from a plan until it is at the lower bound, stuck, or out of time.
+
+        :param volumes: list of volumes.
+        :param bins: list of containers, each a list of positions in volumes.
+        :param lower_bound: Lower bound of the number of containers.
+        :param deadline: time.perf_counter() value to stop at.
+        :return: list of containers, each a list of positions in volumes.
+        """
+        loads = [sum(volumes[position] for position in positions) for positions in bins]
+        improved = True
+        while improved and len(bins) > lower_bound and time.perf_counter() < deadline:
+            improved = False
+            for target in sorted(range(len(bins)), key=loads.__getitem__):
+                emptied = self._try_empty(volumes, bins, loads, target, deadline)
+                if emptied is not None:
+                    bins, free = emptied
+                    loads = [self.container_volume - left for left in free]
+                    improved = True
+                    break
+                if time.perf_counter() >= deadline:
+                    break
+        return bins
+
+    def _try_empty(self, volumes: list, bins: list, loads: list, target: int, deadline: float):
+        """
+        Try to move every volume of the target container into the other containers.
+
+        A volume that fits nowhere is swapped with a strictly smaller one that then has to be moved instead.
+
+        :param volumes: list of volumes.
+        :param bins: list of containers, each a list of positions in volumes.
+        :param loads: Used volume of every container.
+        :param target: Index of the container to empty.
+        :param deadline: time.perf_counter() value to stop at.
+        :return: Tuple of the new list of containers without the target and their free volumes,
+            or None if the target could not be emptied in time.
+        """
+        others = [list(positions) for index, positions in enumerate(bins) if index != target]
+        free = [self.container_volume - load for index, load in enumerate(loads) if index != target]
+        pending = [(-volumes[position], position) for position in bins[target]]
+        heapq.heapify(pending)
+
+        while pending:
+            if time.perf_counter() >= deadline:
+                return None
+            _, position = heapq.heappop(pending)
+            volume = volumes[position]
+
+            fitting = [index for index, left in enumerate(free) if left >= volume]
+            if fitting:
+                index = min(fitting, key=free.__getitem__)
+                others[index].append(position)
+                free[index] -= volume
+                continue
+
+            swap = None
+            for index, positions in enumerate(others):
+                if time.perf_counter() >= deadline:
+                    return None
+                for other in positions:
+                    other_volume = volumes[other]
+                    slack = free[index] + other_volume - volume
+                    if other_volume < volume and slack >= 0 and (swap is None or slack < swap[0]):
+                        swap = (slack, index, other)
+            if swap is None:
+                return None
+
+            _, index, other = swap
+            others[index].remove(other)
+            others[index].append(position)
+            free[index] -= volume - volumes[other]
+            heapq.heappush(pending, (-volumes[other], other))
+
+        return others, free
+
+
+class IncrementalContainerPlanner:
+    """
+    Container plan that is kept between calls and updated in place.
+
+    New orders are placed into the existing containers of their destination and
+    cancelled orders free their space again, using the same free-space indexes
+    as PackingEngine. Containers emptied by cancellations stay in the plan and
+    are reused by later orders, so container positions never shift.
+    """
+
+    def __init__(self, container_volume: int, strategy: str = "first-fit"):
+        """
+        Initialize an empty plan.
+
+        :param container_volume: Volume of each container created by this planner.
+        :param strategy: Packing strategy, one of PackingEngine.STRATEGIES.
+        """
+        self.container_volume = container_volume
+        self.engine = PackingEngine(container_volume, strategy)
+        self.containers = {}
+        self._free_space = {}
+        self._placements = {}
+        self._not_used = {}
+
+    @property
+    def not_used_orders(self) -> list:
+        """
+        Return the orders that are too big for a container, in the order they were added.
+
+        :return: list of orders.
+        """
+        return list(self._not_used)
+
+    def add_orders(self, orders) -> dict:
+        """
+        Place new orders into the plan.
+
+        Orders that are already in the plan, placed or too big, are ignored.
+
+        :param orders: Iterable of orders.
+        :return: dict where keys are destinations and values are the containers that changed.
+        """
+        _, decreasing = PackingEngine.STRATEGIES[self.engine.strategy]
+        if decreasing:
+            orders = sorted(orders, key=lambda order: -order.total_volume)
+
+        changed = {}
+        for order in orders:
+            if order in self._placements or order in self._not_used:
+                continue
+            volume = order.total_volume
+            if volume > self.container_volume:
+                self._not_used[order] = None
+                continue
+
+            destination = order.destination
+            if destination not in self._free_space:
+                self._free_space[destination] = self.engine.new_index()
+                self.containers[destination] = []
+            containers = self.containers[destination]
+
+            index = self._free_space[destination].place(volume)
+            if index == len(containers):
+                containers.append(Container(self.container_volume))
+            containers[index].add_order(order)
+            self._placements[order] = (destination, index, volume)
+            changed.setdefault(destination, {})[index] = containers[index]
+
+        return {destination: list(by_index.values()) for destination, by_index in changed.items()}
+
+    def cancel_orders(self, orders) -> dict:
+        """
+        Remove orders from the plan.
+
+        Orders that are not in the plan are ignored.
+
+        :param orders: Iterable of orders.
+        :return: dict where keys are destinations and values are the containers that changed.
+        """
+        changed = {}
+        for order in orders:
+            placement = self._placements.pop(order, None)
+            if placement is None:
+                self._not_used.pop(order, None)
+                continue
+
+            destination, index, volume = placement
+            container = self.containers[destination][index]
+            container.remove_order(order, volume)
+            self._free_space[destination].release(index, volume)
+            changed.setdefault(destination, {})[index] = container
+
+        return {destination: list(by_index.values()) for destination, by_index in changed.items()}
+
 
 if __name__ == '__main__':
     print("Order items")
@@ -0,0 +1,139 @@
+"""Benchmarks and synthetic workloads for the order pipeline."""
+import argparse
+import json
+import platform
+import random
+import time
+
+from order import (ConcurrentOrderAggregator, ContainerAggregator, IndexedOrderAggregator, Order, OrderAggregator,
+                   OrderItem, PackingEngine)
+
+AGGREGATORS = {
+    "list": OrderAggregator,
+    "indexed": IndexedOrderAggregator,
+    "concurrent": ConcurrentOrderAggregator,
+}
+
+
+def generate_items(count: int, customers: int, max_quantity: int, max_item_volume: int, seed: int) -> list:
+    """
+    Generate a reproducible list of order items.
+
+    :param count: Number of items.
+    :param customers: Number of distinct customers.
+    :param max_quantity: Largest quantity of one item.
+    :param max_item_volume: Largest volume of one piece of an item.
+    :param seed: Random seed.
+    :return: list of order items.
+    """
+    rng = random.Random(seed)
+    return [OrderItem(f"customer-{rng.randrange(customers)}", f"item-{number}",
+                      rng.randint(1, max_quantity), rng.randint(1, max_item_volume))
+            for number in range(count)]
+
+
+def generate_orders(items: list, items_per_order: int, destinations: int, seed: int) -> list:
+    """
+    Group consecutive items into orders with random destinations.
+
+    :param items: list of order items.
+    :param items_per_order: Number of items in one order.
+    :param destinations: Number of distinct destinations.
+    :param seed: Random seed.
+    :return: list of orders.
+    """
+    rng = random.Random(seed)
+    orders = []
+    for start in range(0, len(items), items_per_order):
+        order = Order(items[start:start + items_per_order])
+        order.destination = f"destination-{rng.randrange(destinations)}"
+        orders.append(order)
+    return orders
+
+
+def timed(function, *args) -> tuple:
+    """
+    Call a function and measure how long it took.
+
+    :param function: Function to call.
+    :param args: Arguments of the function.
+    :return: tuple of the result and elapsed seconds.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(size: int, args) -> list:
+    """
+    Benchmark add_item, aggregate_order and prepare_containers on one workload size.
+
+    :param size: Number of order items.
+    :param args: Parsed command line arguments.
+    :return: list of result records.
+    """
+    items = generate_items(size, args.customers, args.max_quantity, args.max_item_volume, args.seed)
+    customers = sorted({item.customer for item in items})[:args.aggregate_customers]
+    aggregator = AGGREGATORS[args.aggregator]()
+    max_items_quantity = args.max_quantity * args.items_per_order
+    max_volume = args.max_quantity * args.max_item_volume * args.items_per_order
+
+    def add_all():
+        for item in items:
+            aggregator.add_item(item)
+
+    def aggregate_all():
+        return [aggregator.aggregate_order(customer, max_items_quantity, max_volume) for customer in customers]
+
+    _, add_seconds = timed(add_all)
+    _, aggregate_seconds = timed(aggregate_all)
+
+    orders = generate_orders(items, args.items_per_order, args.destinations, args.seed)
+    container_aggregator = ContainerAggregator(args.container_volume, args.strategy)
+    _, prepare_seconds = timed(container_aggregator.prepare_containers, tuple(orders))
+
+    common = {"size": size, "aggregator": args.aggregator, "strategy": args.strategy, "seed": args.seed}
+    return [
+        dict(common, operation="add_item", calls=size, seconds=add_seconds),
+        dict(common, operation="aggregate_order", calls=len(customers), seconds=aggregate_seconds),
+        dict(common, operation="prepare_containers", calls=len(orders), seconds=prepare_seconds),
+    ]
+
+
+def main():
+    """Run the benchmarks and write one JSON record per line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6])
+    parser.add_argument("--aggregator", choices=sorted(AGGREGATORS), default="indexed")
+    parser.add_argument("--strategy", choices=sorted(PackingEngine.STRATEGIES), default="first-fit")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--aggregate-customers", type=int, default=None,
+                        help="aggregate only this many customers, the plain list aggregator is quadratic")
+    parser.add_argument("--max-quantity", type=int, default=20)
+    parser.add_argument("--max-item-volume", type=int, default=500)
+    parser.add_argument("--items-per-order", type=int, default=10)
+    parser.add_argument("--destinations", type=int, default=200)
+    parser.add_argument("--container-volume", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="-", help="file to append JSON lines to, - for stdout")
+    args = parser.parse_args()
+
+    environment = {"python": platform.python_version(), "machine": platform.machine()}
+    output = open(args.output, "a", encoding="utf-8") if args.output != "-" else None
+    try:
+        for size in args.sizes:
+            for record in run(size, args):
+                per_second = record["calls"] / record["seconds"] if record["seconds"] else None
+                record.update(environment, per_second=per_second)
+                line = json.dumps(record)
+                if output is None:
+                    print(line)
+                else:
+                    output.write(line + "\n")
+    finally:
+        if output is not None:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Streaming loader of order lines into an order aggregator."""
+import csv
+import itertools
+import json
+import os
+
+from order import OrderAggregator, OrderItem
+
+FIELDS = ("customer", "name", "quantity", "one_item_volume")
+
+
+class MalformedRow(ValueError):
+    """Raw line of an input file that could not be parsed into a row."""
+
+
+def read_rows(path: str):
+    """
+    Read order lines from a CSV or JSONL file one row at a time.
+
+    CSV files must have a header with the names in FIELDS, JSONL files hold one object per line.
+    The format is chosen by the extension, case-insensitively.
+    CSV lines the csv module cannot read and JSONL lines that are not valid JSON are yielded
+    as MalformedRow so iter_order_items can reject them.
+
+    :param path: Path to a .csv or .jsonl file.
+    :return: Generator of (line number, row) pairs, where the line number is the file line the row ends on.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".csv", ".jsonl"):
+        raise ValueError(f"Unknown order file format: {path}")
+
+    with open(path, newline="", encoding="utf-8") as file:
+        if extension == ".csv":
+            reader = csv.DictReader(file)
+            while True:
+                previous_line = reader.line_num
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as error:
+                    # The reader may fail before counting the line it was reading
+                    yield max(reader.line_num, previous_line + 1), MalformedRow(str(error))
+                    continue
+                yield reader.line_num, row
+
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as error:
+                yield line_number, MalformedRow(f"{error}: {line.rstrip()}")
+
+
+def to_order_item(row) -> OrderItem:
+    """
+    Build an order item from a row.
+
+    Missing or empty customer and name are rejected instead of being turned into strings.
+    Quantity and volume must be positive whole numbers, booleans and fractional numbers are rejected.
+
+    :param row: dict with the keys in FIELDS or a sequence in the same order.
+    :return: OrderItem.
+    """
+    if isinstance(row, MalformedRow):
+        raise row
+    if isinstance(row, dict):
+        customer, name, quantity, one_item_volume = (row[field] for field in FIELDS)
+    else:
+        customer, name, quantity, one_item_volume = row
+    for field, value in (("customer", customer), ("name", name)):
+        if value is None or not str(value).strip():
+            raise ValueError(f"Missing {field}")
+    return OrderItem(str(customer), str(name), _positive_int("quantity", quantity),
+                     _positive_int("one_item_volume", one_item_volume))
+
+
+def _positive_int(field: str, value) -> int:
+    """
+    Convert a quantity or volume to int without rounding.
+
+    :param field: Name of the field, for the error message.
+    :param value: int, integral float or decimal string.
+    :return: Positive int.
+    """
+    if isinstance(value, bool):
+        raise TypeError(f"{field} must be a number, not {value!r}")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{field} must be a whole number, not {value!r}")
+        value = int(value)
+    elif not isinstance(value, int):
+        value = int(value)
+    if value < 1:
+        raise ValueError(f"{field} must be positive, not {value!r}")
+    return value
+
+
+def iter_order_items(rows, rejected: list = None, numbered: bool = False):
+    """
+    Lazily turn rows into order items.
+
+    Rows that cannot be converted are reported to rejected and skipped instead of stopping the stream.
+
+    :param rows: Iterable of rows accepted by to_order_item.
+    :param rejected: Optional list that receives (row number, row, reason) of malformed rows.
+    :param numbered: Whether rows are (line number, row) pairs like read_rows gives; otherwise
+        rows are numbered by their position starting from 1.
+    :return: Generator of order items.
+    """
+    if not numbered:
+        rows = enumerate(rows, 1)
+    for row_number, row in rows:
+        try:
+            yield to_order_item(row)
+        except (KeyError, TypeError, ValueError) as error:
+            if rejected is not None:
+                rejected.append((row_number, row, repr(error)))
+
+
+def load_order_items(aggregator: OrderAggregator, source, batch_size: int = 10000, on_batch=None,
+                     rejected: list = None) -> int:
+    """
+    Stream order lines into the aggregator in batches.
+
+    Only one batch of items is built at a time. on_batch is called after every batch is
+    added, so it can aggregate and drain the aggregator to keep memory flat.
+
+    :param aggregator: Aggregator to add items to.
+    :param source: Path to a .csv or .jsonl file or an iterable of rows.
+    :param batch_size: Maximum number of items added at once.
+    :param on_batch: Optional callable that receives the aggregator after every batch.
+    :param rejected: Optional list that receives (row number, row, reason) of malformed rows.
+        For files the row number is the line number in the file.
+    :return: Number of items added.
+    """
+    if isinstance(source, str):
+        items = iter_order_items(read_rows(source), rejected, numbered=True)
+    else:
+        items = iter_order_items(source, rejected)
+    loaded = 0
+
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return loaded
+        aggregator.add_items(batch)
+        loaded += len(batch)
+        if on_batch is not None:
+            on_batch(aggregator)
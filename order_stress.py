@@ -0,0 +1,131 @@
+"""
+Stress run of ConcurrentOrderAggregator with many producer threads and one planner thread.
+
+Under the GIL adding items cannot get faster with more threads, so the run measures what
+the concurrent aggregator improves: the time producers spend waiting for a lock and the
+throughput of the planner while producers are adding.
+"""
+import argparse
+import threading
+import time
+
+from order import ConcurrentOrderAggregator, OrderAggregator, OrderItem
+
+
+class GlobalLockAggregator:
+    """Plain OrderAggregator behind one lock, the baseline the concurrent aggregator replaces."""
+
+    def __init__(self):
+        """Initialize the wrapped aggregator and its lock."""
+        self.aggregator = OrderAggregator()
+        self.lock = threading.Lock()
+        self.producer_wait = 0.0
+
+    @property
+    def order_items(self) -> list:
+        """Return pending order items."""
+        with self.lock:
+            return list(self.aggregator.order_items)
+
+    def add_item(self, item: OrderItem):
+        """Add order item under the global lock, counting the time spent waiting for it."""
+        if self.lock.acquire(blocking=False):
+            waited = 0.0
+        else:
+            started = time.perf_counter()
+            self.lock.acquire()
+            waited = time.perf_counter() - started
+        try:
+            self.producer_wait += waited
+            self.aggregator.add_item(item)
+        finally:
+            self.lock.release()
+
+    def aggregate_order(self, customer: str, max_items_quantity: int, max_volume: int):
+        """Aggregate an order under the global lock."""
+        with self.lock:
+            return self.aggregator.aggregate_order(customer, max_items_quantity, max_volume)
+
+
+def run(aggregator, threads: int, items_per_thread: int, customers: int) -> dict:
+    """
+    Add items from many threads while a planner thread keeps aggregating.
+
+    Raises AssertionError if an item is lost or aggregated twice.
+
+    :param aggregator: Aggregator under test.
+    :param threads: Number of producer threads.
+    :param items_per_thread: Number of items every producer adds.
+    :param customers: Number of distinct customers.
+    :return: dict with elapsed seconds, items added per second, items aggregated per second
+        and seconds producers spent waiting for a lock.
+    """
+    customer_names = [f"customer-{number}" for number in range(customers)]
+    producers_done = threading.Event()
+    aggregated = []
+
+    def produce(producer: int):
+        for number in range(items_per_thread):
+            customer = customer_names[(producer + number) % customers]
+            aggregator.add_item(OrderItem(customer, f"{producer}-{number}", 1, 1))
+
+    def plan():
+        while not producers_done.is_set():
+            for customer in customer_names:
+                aggregated.extend(aggregator.aggregate_order(customer, 50, 50).order_items)
+
+    producer_threads = [threading.Thread(target=produce, args=(producer,)) for producer in range(threads)]
+    planner = threading.Thread(target=plan)
+
+    start = time.perf_counter()
+    planner.start()
+    for thread in producer_threads:
+        thread.start()
+    for thread in producer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    producers_done.set()
+    planner.join()
+    aggregated_while_producing = len(aggregated)
+
+    names = [item.name for item in aggregated] + [item.name for item in aggregator.order_items]
+    assert len(names) == len(set(names)) == threads * items_per_thread, "items were lost or duplicated"
+
+    return {
+        "elapsed": elapsed,
+        "added_per_second": threads * items_per_thread / elapsed,
+        "aggregated_per_second": aggregated_while_producing / elapsed,
+        # ConcurrentOrderAggregator producers take no lock, so they never wait
+        "producer_wait": getattr(aggregator, "producer_wait", 0.0),
+    }
+
+
+def main():
+    """
+    Print producer and planner throughput of both aggregators for growing thread counts.
+
+    Exits with an error if the concurrent aggregator's planner is slower than the global lock's.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--items", type=int, default=20000, help="items added by every producer thread")
+    parser.add_argument("--customers", type=int, default=1000)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'threads':>8} {'aggregator':>12} {'added':>12} {'aggregated':>12} {'producer wait':>14}")
+    for threads in args.threads:
+        results = {}
+        for name, aggregator in (("global lock", GlobalLockAggregator()), ("concurrent", ConcurrentOrderAggregator())):
+            result = results[name] = run(aggregator, threads, args.items, args.customers)
+            print(f"{threads:>8} {name:>12} {result['added_per_second']:>10.0f}/s "
+                  f"{result['aggregated_per_second']:>10.0f}/s {result['producer_wait']:>13.3f}s")
+        if results["concurrent"]["aggregated_per_second"] < results["global lock"]["aggregated_per_second"]:
+            failures.append(f"{threads} threads: concurrent planner is slower than with a global lock")
+
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,15 @@
 """Twitter."""
+import collections
+import heapq
+import itertools
+import operator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class Tweet:
@@ -52,6 +63,35 @@ def sort_by_popularity(tweets: list) -> list:
     return sorted(tweets, key=lambda tweet: (tweet.retweets, -tweet.time), reverse=True)
 
 
+def top_fastest_growing(tweets: Iterable, k: int) -> list:
+    """
+    Find the k fastest growing tweets.
+
+    Growth is measured as in find_fastest_growing. Tweets are consumed one at a time
+    and only the k best are kept, so any iterable or generator can be ranked.
+    Equally fast growing tweets keep their input order.
+
+    :param tweets: Input iterable of tweets.
+    :param k: Amount of tweets to return.
+    :return: List of at most k tweets, fastest growing first.
+    """
+    return heapq.nlargest(k, tweets, key=lambda tweet: tweet.retweets / tweet.time)
+
+
+def top_by_popularity(tweets: Iterable, k: int) -> list:
+    """
+    Find the k most popular tweets.
+
+    Same as sort_by_popularity(tweets)[:k], but only the k best tweets are kept
+    while the input is consumed.
+
+    :param tweets: Input iterable of tweets.
+    :param k: Amount of tweets to return.
+    :return: List of at most k tweets by popularity.
+    """
+    return heapq.nlargest(k, tweets, key=lambda tweet: (tweet.retweets, -tweet.time))
+
+
 def filter_by_hashtag(tweets: list, hashtag: str) -> list:
     """
     Filter tweets by hashtag.
@@ -65,7 +105,7 @@ def filter_by_hashtag(tweets: list, hashtag: str) -> list:
     return [tweet for tweet in tweets if hashtag in tweet.content]
 
 
-def sort_hashtags_by_popularity(tweets: list) -> list:
+def sort_hashtags_by_popularity(tweets: Iterable, workers: int = None, chunk_size: int = 10000) -> list:
     """
     Sort hashtags by popularity.
 
@@ -76,21 +116,463 @@ def sort_hashtags_by_popularity(tweets: list) -> list:
     >Tweet2 has 19 retweets and has common hashtag.
     >The popularity of that hashtag is 19 + 21 = 40.
 
-    :param tweets: Input list of tweets.
+    With workers, the tweets are split into chunks of (content, retweets) pairs that are
+    counted on a process pool, and the partial counts are added together in the order the
+    chunks were sent. At most workers * 2 chunks are in flight, so the tweets are read
+    only as fast as they are counted. The ordering does not depend on how the tweets were split.
+
+    :param tweets: Input iterable of tweets.
+    :param workers: Number of worker processes to count hashtags with (default is serial).
+    :param chunk_size: Amount of tweets sent to a worker at once.
     :return: List of hashtags by popularity.
     """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    if workers and workers > 1:
+        hashtags_popular = {}
+        chunks = _content_chunks(tweets, chunk_size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = collections.deque(
+                executor.submit(_count_hashtags, chunk) for chunk in itertools.islice(chunks, workers * 2))
+            while in_flight:
+                partial = in_flight.popleft().result()
+                for chunk in itertools.islice(chunks, 1):
+                    in_flight.append(executor.submit(_count_hashtags, chunk))
+                for hashtag, popularity in partial.items():
+                    hashtags_popular[hashtag] = hashtags_popular.get(hashtag, 0) + popularity
+    else:
+        hashtags_popular = _count_hashtags((tweet.content, tweet.retweets) for tweet in tweets)
+
+    sorted_popular = sorted(hashtags_popular.items(), key=lambda x: (-x[1], x[0]))
+    return [hashtag for hashtag, _ in sorted_popular]
+
+
+def extract_hashtags(content: str) -> list:
+    """
+    Find the hashtags of a tweet's content.
+
+    A hashtag is a whitespace separated word that starts with '#'.
+    A hashtag used several times in the content is returned several times.
+
+    :param content: Content of the tweet.
+    :return: List of hashtags in the order they appear.
+    """
+    return [word for word in content.split() if word.startswith('#')]
+
+
+def _count_hashtags(contents: Iterable) -> dict:
+    """
+    Sum the retweets of every hashtag.
+
+    :param contents: Iterable of (content, retweets) pairs.
+    :return: dict of hashtag -> popularity.
+    """
     hashtags_popular = {}
 
-    for tweet in tweets:
-        hashtags = [word for word in tweet.content.split() if word.startswith('#')]
-        for hashtag in hashtags:
+    for content, retweets in contents:
+        for hashtag in extract_hashtags(content):
             if hashtag in hashtags_popular:
-                hashtags_popular[hashtag] += tweet.retweets
+                hashtags_popular[hashtag] += retweets
             else:
-                hashtags_popular[hashtag] = tweet.retweets
+                hashtags_popular[hashtag] = retweets
 
-    sorted_popular = sorted(hashtags_popular.items(), key=lambda x: (-x[1], x[0]))
-    return [hashtag for hashtag, _ in sorted_popular]
+    return hashtags_popular
+
+
+def _content_chunks(tweets: Iterable, chunk_size: int):
+    """
+    Split tweets into lists of (content, retweets) pairs, so whole tweets are not sent to the workers.
+
+    :param tweets: Input iterable of tweets.
+    :param chunk_size: Amount of tweets in a chunk.
+    :return: Generator of chunks.
+    """
+    pairs = ((tweet.content, tweet.retweets) for tweet in tweets)
+    while True:
+        chunk = list(itertools.islice(pairs, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TweetIndex:
+    """
+    Hashtag index of a tweet corpus.
+
+    Every tweet is tokenized once when it is added. For each hashtag the index keeps a posting
+    list of its tweets in the order they were added, so queries cost time proportional to
+    the posting lists they touch instead of a scan over the whole corpus.
+    Unlike filter_by_hashtag, hashtags are matched as whole words: "#big" does not match "#bigsmart".
+    """
+
+    def __init__(self, tweets: Iterable = ()):
+        """
+        TweetIndex constructor.
+
+        :param tweets: Initial tweets of the corpus.
+        """
+        self._sequence = 0
+        self._hashtags = {}
+        self._postings = {}
+        for tweet in tweets:
+            self.add(tweet)
+
+    def __len__(self) -> int:
+        """Return the amount of indexed tweets."""
+        return len(self._hashtags)
+
+    def __contains__(self, tweet: Tweet) -> bool:
+        """Return whether the tweet is indexed."""
+        return tweet in self._hashtags
+
+    def add(self, tweet: Tweet):
+        """
+        Add a tweet to the end of the corpus.
+
+        :param tweet: Tweet to add.
+        """
+        if tweet in self._hashtags:
+            raise ValueError("Tweet is already indexed.")
+        hashtags = collections.Counter(extract_hashtags(tweet.content))
+        self._hashtags[tweet] = hashtags
+        for hashtag in hashtags:
+            self._postings.setdefault(hashtag, {})[tweet] = self._sequence
+        self._sequence += 1
+
+    def remove(self, tweet: Tweet):
+        """
+        Remove a tweet from the corpus.
+
+        :param tweet: Tweet to remove.
+        """
+        for hashtag in self._hashtags.pop(tweet):
+            posting = self._postings[hashtag]
+            del posting[tweet]
+            if not posting:
+                del self._postings[hashtag]
+
+    def hashtags(self) -> list:
+        """
+        Return all hashtags used in the corpus.
+
+        :return: List of hashtags in the order they first appeared.
+        """
+        return list(self._postings)
+
+    def filter_by_hashtag(self, hashtag: str) -> list:
+        """
+        Filter tweets by hashtag.
+
+        :param hashtag: Hashtag to filter by.
+        :return: List of tweets that contain the hashtag, in corpus order.
+        """
+        return list(self._postings.get(hashtag, ()))
+
+    def filter_by_all(self, *hashtags: str) -> list:
+        """
+        Filter tweets that contain every given hashtag.
+
+        The shortest posting list is walked and checked against the others.
+
+        :param hashtags: Hashtags to filter by.
+        :return: List of matching tweets in corpus order.
+        """
+        if not hashtags:
+            return []
+        postings = sorted((self._postings.get(hashtag, {}) for hashtag in set(hashtags)), key=len)
+        shortest, others = postings[0], postings[1:]
+        return [tweet for tweet in shortest if all(tweet in posting for posting in others)]
+
+    def filter_by_any(self, *hashtags: str) -> list:
+        """
+        Filter tweets that contain at least one of the given hashtags.
+
+        The posting lists are already in corpus order, so they are merged instead of sorted.
+
+        :param hashtags: Hashtags to filter by.
+        :return: List of matching tweets in corpus order, each tweet once.
+        """
+        postings = [self._postings[hashtag].items() for hashtag in set(hashtags) if hashtag in self._postings]
+        if len(postings) == 1:
+            return [tweet for tweet, _ in postings[0]]
+        result = []
+        last = None
+        for tweet, sequence in heapq.merge(*postings, key=operator.itemgetter(1)):
+            if sequence != last:
+                result.append(tweet)
+                last = sequence
+        return result
+
+    def sort_hashtags_by_popularity(self) -> list:
+        """
+        Sort the corpus' hashtags by popularity.
+
+        Same ordering as sort_hashtags_by_popularity, but uses the posting lists instead of
+        tokenizing the contents again. Current retweet counts of the tweets are used.
+
+        :return: List of hashtags by popularity.
+        """
+        popularity = {
+            hashtag: sum(tweet.retweets * self._hashtags[tweet][hashtag] for tweet in posting)
+            for hashtag, posting in self._postings.items()
+        }
+        return sorted(popularity, key=lambda hashtag: (-popularity[hashtag], hashtag))
+
+
+class HashtagRanking:
+    """
+    Hashtag popularity ranking that is kept up to date as tweets change.
+
+    Popularity and ordering are the same as in sort_hashtags_by_popularity.
+    Every change pushes an entry (-popularity, hashtag, version) to a heap, outdated
+    versions are skipped when the ranking is read. This keeps updates at O(log n)
+    per hashtag of the tweet and top(k) at O(k log k) without sorting all hashtags.
+    """
+
+    def __init__(self, tweets: Iterable = ()):
+        """
+        HashtagRanking constructor.
+
+        :param tweets: Initial tweets.
+        """
+        self._tweets = {}
+        self._popularity = {}
+        self._tweet_counts = {}
+        self._versions = {}
+        self._version_counter = itertools.count()
+        self._heap = []
+        for tweet in tweets:
+            self.add(tweet)
+
+    def __len__(self) -> int:
+        """Return the amount of ranked hashtags."""
+        return len(self._popularity)
+
+    def popularity(self, hashtag: str) -> int:
+        """
+        Return the popularity of a hashtag.
+
+        :param hashtag: Hashtag to look up.
+        :return: Sum of retweets of the hashtag's tweets, 0 if it is not used.
+        """
+        return self._popularity.get(hashtag, 0)
+
+    def add(self, tweet: Tweet):
+        """
+        Add a tweet to the ranking.
+
+        :param tweet: Tweet to add.
+        """
+        if tweet in self._tweets:
+            raise ValueError("Tweet is already ranked.")
+        hashtags = collections.Counter(extract_hashtags(tweet.content))
+        self._tweets[tweet] = (tweet.retweets, hashtags)
+        for hashtag, count in hashtags.items():
+            self._tweet_counts[hashtag] = self._tweet_counts.get(hashtag, 0) + 1
+            self._set(hashtag, self._popularity.get(hashtag, 0) + count * tweet.retweets)
+
+    def remove(self, tweet: Tweet):
+        """
+        Remove a tweet from the ranking.
+
+        Hashtags that are left without tweets are dropped from the ranking.
+
+        :param tweet: Tweet to remove.
+        """
+        retweets, hashtags = self._tweets.pop(tweet)
+        for hashtag, count in hashtags.items():
+            self._tweet_counts[hashtag] -= 1
+            if self._tweet_counts[hashtag]:
+                self._set(hashtag, self._popularity[hashtag] - count * retweets)
+            else:
+                del self._tweet_counts[hashtag]
+                del self._popularity[hashtag]
+                del self._versions[hashtag]
+
+    def update(self, tweet: Tweet, retweets: int = None):
+        """
+        Update the ranking after the tweet's retweets count changed.
+
+        :param tweet: Ranked tweet.
+        :param retweets: New amount of retweets, stored to the tweet. If not given,
+            the tweet's current retweets count is used.
+        """
+        if retweets is not None:
+            tweet.retweets = retweets
+        old_retweets, hashtags = self._tweets[tweet]
+        if tweet.retweets == old_retweets:
+            return
+        self._tweets[tweet] = (tweet.retweets, hashtags)
+        for hashtag, count in hashtags.items():
+            self._set(hashtag, self._popularity[hashtag] + count * (tweet.retweets - old_retweets))
+
+    def top(self, k: int) -> list:
+        """
+        Find the k most popular hashtags.
+
+        The heap is walked best first from the root, so only about k entries and
+        their children are looked at.
+
+        :param k: Amount of hashtags to return.
+        :return: List of at most k hashtags by popularity.
+        """
+        heap = self._heap
+        result = []
+        candidates = [(heap[0], 0)] if heap else []
+        while candidates and len(result) < k:
+            entry, index = heapq.heappop(candidates)
+            if self._versions.get(entry[1]) == entry[2]:
+                result.append(entry[1])
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child], child))
+        return result
+
+    def _set(self, hashtag: str, popularity: int):
+        """
+        Store a new popularity of a hashtag.
+
+        :param hashtag: Hashtag to update.
+        :param popularity: New popularity.
+        """
+        # Versions are unique over all hashtags, so entries of a dropped and re-added hashtag stay outdated
+        version = next(self._version_counter)
+        self._versions[hashtag] = version
+        self._popularity[hashtag] = popularity
+        heapq.heappush(self._heap, (-popularity, hashtag, version))
+        if len(self._heap) > 2 * len(self._popularity) + 16:
+            self._heap = [entry for entry in self._heap if self._versions.get(entry[1]) == entry[2]]
+            heapq.heapify(self._heap)
+
+
+class TweetBatch:
+    """
+    Columnar batch of tweets for vectorized ranking.
+
+    Users are stored as indexes into a list of distinct users, times and retweets as typed
+    NumPy arrays. Contents are kept in one UTF-8 buffer where the content of tweet i is
+    buffer[offsets[i]:offsets[i + 1]]. Requires NumPy.
+    """
+
+    def __init__(self, users: list, contents: list, times: list, retweets: list):
+        """
+        TweetBatch constructor.
+
+        :param users: Authors of the tweets.
+        :param contents: Contents of the tweets.
+        :param times: Ages of the tweets.
+        :param retweets: Amounts of retweets.
+        """
+        if numpy is None:
+            raise ImportError("TweetBatch requires NumPy.")
+        if not len(users) == len(contents) == len(times) == len(retweets):
+            raise ValueError("All columns must have the same length.")
+        user_ids = {}
+        self.user_names = []
+        for user in users:
+            if user not in user_ids:
+                user_ids[user] = len(self.user_names)
+                self.user_names.append(user)
+        self.users = numpy.fromiter((user_ids[user] for user in users), dtype=numpy.int32, count=len(users))
+        encoded = [content.encode("utf-8") for content in contents]
+        self.offsets = numpy.zeros(len(encoded) + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.fromiter(map(len, encoded), dtype=numpy.int64, count=len(encoded)), out=self.offsets[1:])
+        self.buffer = b"".join(encoded)
+        self.times = numpy.asarray(times, dtype=numpy.float64)
+        self.retweets = numpy.asarray(retweets, dtype=numpy.int64)
+
+    @classmethod
+    def from_tweets(cls, tweets: list) -> "TweetBatch":
+        """
+        Build a batch from tweets.
+
+        :param tweets: Input list of tweets.
+        :return: Batch with the tweets in the same order.
+        """
+        return cls(
+            [tweet.user for tweet in tweets],
+            [tweet.content for tweet in tweets],
+            [tweet.time for tweet in tweets],
+            [tweet.retweets for tweet in tweets],
+        )
+
+    def __len__(self) -> int:
+        """Return the amount of tweets in the batch."""
+        return len(self.times)
+
+    def content(self, index: int) -> str:
+        """
+        Return the content of a tweet.
+
+        :param index: Position of the tweet in the batch.
+        :return: Content of the tweet.
+        """
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+    def tweet(self, index: int) -> Tweet:
+        """
+        Build a Tweet object of a tweet in the batch.
+
+        :param index: Position of the tweet in the batch.
+        :return: Tweet at the position.
+        """
+        return Tweet(
+            self.user_names[self.users[index]], self.content(index),
+            float(self.times[index]), int(self.retweets[index]),
+        )
+
+    def to_tweets(self, indexes=None) -> list:
+        """
+        Convert the batch to a list of tweets.
+
+        :param indexes: Positions of the tweets to convert, all tweets by default.
+        :return: List of tweets.
+        """
+        if indexes is None:
+            indexes = range(len(self))
+        return [self.tweet(index) for index in indexes]
+
+    def fastest_growing_index(self) -> int:
+        """
+        Find the position of the fastest growing tweet, as in find_fastest_growing.
+
+        Like find_fastest_growing, a tweet with zero time raises ZeroDivisionError instead of
+        becoming inf or NaN, which argmax would pick as the maximum.
+
+        :return: Position of the first tweet with the biggest retweets/time.
+        """
+        if not len(self):
+            raise ValueError("Batch is empty.")
+        if not self.times.all():
+            raise ZeroDivisionError("Tweet time must not be zero.")
+        return int(numpy.argmax(self.retweets / self.times))
+
+    def find_fastest_growing(self) -> Tweet:
+        """
+        Find the fastest growing tweet, as in find_fastest_growing.
+
+        :return: Fastest growing tweet.
+        """
+        return self.tweet(self.fastest_growing_index())
+
+    def popularity_order(self):
+        """
+        Find the positions of the tweets by popularity, as in sort_by_popularity.
+
+        lexsort is stable, so tweets with equal retweets and time keep their batch order
+        like they do with sorted().
+
+        :return: NumPy array of positions, most popular first.
+        """
+        return numpy.lexsort((self.times, -self.retweets))
+
+    def sort_by_popularity(self) -> list:
+        """
+        Sort tweets by popularity, as in sort_by_popularity.
+
+        :return: List of tweets by popularity.
+        """
+        return self.to_tweets(self.popularity_order())
 
 
 if __name__ == '__main__':
@@ -106,9 +588,19 @@ if __name__ == '__main__':
     print(filtered_by_popularity[1].user)  # -> "@elonmusk"
     print(filtered_by_popularity[2].user)  # -> "@realDonaldTrump"
 
+    print(top_by_popularity(iter(tweets), 1)[0].user)  # -> "@CIA"
+
     filtered_by_hashtag = filter_by_hashtag(tweets, "#bigsmart")
     print(filtered_by_hashtag[0].user)  # -> "@realDonaldTrump"
     print(filtered_by_hashtag[1].user)  # -> "@elonMusk"
 
     sorted_hashtags = sort_hashtags_by_popularity(tweets)
     print(sorted_hashtags[0])  # -> "#heart"
+
+    index = TweetIndex(tweets)
+    print(index.filter_by_hashtag("#bigsmart")[1].user)  # -> "@elonmusk"
+    print(len(index.filter_by_any("#bigsmart", "#heart")))  # -> 3
+
+    ranking = HashtagRanking(tweets)
+    ranking.update(tweet1, 300000)
+    print(ranking.top(1))  # -> ['#bigsmart']